@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Build a romanized-Nepali search index for dictionary and constitution lookup.
+Transliterates every Nepali dictionary key and constitution token to an
+ITRANS-like romanization, collapses phonetic variants (aa/a, sh/s, w/b, ...)
+into a single key, and writes romanized_index.json mapping each key to the
+Devanagari words it can stand for.
+
+A romanized query is resolved by applying the same phonetic_key() to it and
+doing one dictionary lookup, e.g. "adhikar", "adhikaar" and "adhikara" all
+resolve to अधिकार.
+"""
+
+import json
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from build_dictionary import tokenize_nepali
+
+# Independent vowels
+VOWELS = {
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
+    'ऋ': 'ri', 'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+}
+
+# Dependent vowel signs (replace the inherent 'a' of the preceding consonant)
+MATRAS = {
+    'ा': 'aa', 'ि': 'i', 'ी': 'ii', 'ु': 'u', 'ू': 'uu',
+    'ृ': 'ri', 'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
+}
+
+CONSONANTS = {
+    'क': 'k', 'ख': 'kh', 'ग': 'g', 'घ': 'gh', 'ङ': 'ng',
+    'च': 'ch', 'छ': 'chh', 'ज': 'j', 'झ': 'jh', 'ञ': 'ny',
+    'ट': 't', 'ठ': 'th', 'ड': 'd', 'ढ': 'dh', 'ण': 'n',
+    'त': 't', 'थ': 'th', 'द': 'd', 'ध': 'dh', 'न': 'n',
+    'प': 'p', 'फ': 'ph', 'ब': 'b', 'भ': 'bh', 'म': 'm',
+    'य': 'y', 'र': 'r', 'ल': 'l', 'व': 'w',
+    'श': 'sh', 'ष': 'sh', 'स': 's', 'ह': 'h',
+    'ड़': 'r', 'ढ़': 'rh', '\u095c': 'r', '\u095d': 'rh',
+}
+
+# Conjuncts whose everyday spelling differs from letter-by-letter ITRANS
+CONJUNCTS = {
+    'ज्ञ': 'gy',
+}
+
+VIRAMA = '्'
+NUKTA = '़'
+SIGNS = {
+    'ं': 'n',   # anusvara (typed as n or m; see phonetic_key)
+    'ँ': 'n',   # chandrabindu
+    'ः': 'h',   # visarga
+}
+
+# Phonetic collapses applied, in order, to romanizations and queries alike.
+# The Flutter/web search must apply the same rules before looking up a query.
+PHONETIC_RULES = [
+    ('chh', 'ch'),
+    ('sh', 's'),
+    ('ph', 'f'),
+    ('w', 'b'),
+    ('v', 'b'),
+    ('ee', 'i'),
+    ('oo', 'u'),
+    ('z', 'j'),
+    ('q', 'k'),
+]
+
+DEVANAGARI_WORD = re.compile(r'^[ऀ-ॣॱ-ॿ]+$')
+
+
+def romanize(word: str) -> str:
+    """Transliterate a Devanagari word to an ITRANS-like lowercase romanization."""
+    out = []
+    i = 0
+    pending_a = False  # consonant emitted, inherent 'a' not yet resolved
+
+    while i < len(word):
+        conjunct = word[i:i + 3]
+        if conjunct in CONJUNCTS:
+            if pending_a:
+                out.append('a')
+            out.append(CONJUNCTS[conjunct])
+            pending_a = True
+            i += 3
+            continue
+
+        ch = word[i]
+        if i + 1 < len(word) and word[i + 1] == NUKTA:
+            ch = word[i:i + 2]
+            i += 1
+
+        if ch in CONSONANTS:
+            if pending_a:
+                out.append('a')
+            out.append(CONSONANTS[ch])
+            pending_a = True
+        elif ch in MATRAS:
+            out.append(MATRAS[ch])
+            pending_a = False
+        elif ch == VIRAMA:
+            pending_a = False
+        elif ch in VOWELS:
+            if pending_a:
+                out.append('a')
+                pending_a = False
+            out.append(VOWELS[ch])
+        elif ch in SIGNS:
+            if pending_a:
+                out.append('a')
+                pending_a = False
+            out.append(SIGNS[ch])
+        # Anything else (nukta, avagraha, digits, punctuation) is dropped
+        i += 1
+
+    # Nepali drops the word-final inherent vowel: अधिकार -> adhikar
+    return ''.join(out)
+
+
+def phonetic_key(text: str) -> str:
+    """Collapse a romanization (or a user query) to its phonetic lookup key."""
+    key = re.sub(r'[^a-z]', '', text.lower())
+    for src, dst in PHONETIC_RULES:
+        key = key.replace(src, dst)
+    # Anusvara is typed as m or n before a consonant (samvidhan/sanvidhan)
+    key = re.sub(r'm(?=[^aeiouy])', 'n', key)
+    # aa/a, ii/i, uu/u and doubled consonants all collapse to one letter
+    key = re.sub(r'(.)\1+', r'\1', key)
+    # A trailing 'a' is optional in romanized Nepali (sabha/sabh, nepala/nepal)
+    if len(key) > 1 and key.endswith('a'):
+        key = key[:-1]
+    return key
+
+
+def extract_constitution_tokens(data: dict) -> Counter:
+    """Count Nepali tokens across the title, preamble and every article."""
+    counts = Counter()
+    constitution = data['constitution']
+
+    def add(text: str):
+        for token in tokenize_nepali(text or ''):
+            if DEVANAGARI_WORD.match(token):
+                counts[token] += 1
+
+    add(constitution.get('title', {}).get('np'))
+    add(constitution.get('preamble', {}).get('np'))
+
+    for part in constitution.get('parts', []):
+        add(part.get('title', {}).get('np'))
+        for article in part.get('articles', []):
+            add(article.get('title', {}).get('np'))
+            for item in article.get('content', {}).get('np', []):
+                add(item.get('text'))
+                for sub in item.get('items', []):
+                    add(sub.get('text') if isinstance(sub, dict) else sub)
+
+    return counts
+
+
+def build_index(dictionary_words: List[str], constitution_counts: Counter) -> Dict[str, List[str]]:
+    """Map phonetic keys to Devanagari words, dictionary entries first."""
+    buckets = defaultdict(list)
+    seen = set()
+
+    def add(word: str):
+        if word in seen:
+            return
+        key = phonetic_key(romanize(word))
+        if key:
+            seen.add(word)
+            buckets[key].append(word)
+
+    for word in dictionary_words:
+        add(word)
+    for word, _ in constitution_counts.most_common():
+        add(word)
+
+    return {key: buckets[key] for key in sorted(buckets)}
+
+
+def lookup(index: Dict[str, List[str]], query: str) -> List[str]:
+    """Resolve a romanized query to its Devanagari candidates."""
+    return index.get(phonetic_key(query), [])
+
+
+def main():
+    print("="*60)
+    print("ROMANIZED NEPALI INDEX BUILDER")
+    print("="*60)
+
+    print("\n1. Loading dictionary.json...")
+    with open('dictionary.json', 'r', encoding='utf-8') as f:
+        dictionary = json.load(f)
+    dictionary_words = [w for w in dictionary.get('np_to_en', {}) if DEVANAGARI_WORD.match(w)]
+    print(f"✓ {len(dictionary_words)} single-word Nepali dictionary keys")
+
+    print("\n2. Tokenizing constitution_bilingual.json...")
+    with open('constitution_bilingual.json', 'r', encoding='utf-8') as f:
+        constitution = json.load(f)
+    constitution_counts = extract_constitution_tokens(constitution)
+    print(f"✓ {len(constitution_counts)} unique constitution tokens")
+
+    print("\n3. Building phonetic index...")
+    index = build_index(dictionary_words, constitution_counts)
+    total_words = sum(len(words) for words in index.values())
+    print(f"✓ {len(index)} keys covering {total_words} Devanagari words")
+
+    output = {
+        "meta": {
+            "built_by": "build_romanized_index.py",
+            "phonetic_rules": [list(rule) for rule in PHONETIC_RULES],
+            "nasal_m_to_n": True,
+            "collapse_repeats": True,
+            "strip_trailing_a": True,
+        },
+        "index": index,
+    }
+
+    print("\n4. Saving romanized_index.json...")
+    with open('romanized_index.json', 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, separators=(',', ':'))
+    print("✓ Saved")
+
+    print("\nSample lookups:")
+    for query in ['adhikar', 'adhikaar', 'nagarik', 'sambidhan', 'samvidhaan', 'rastriya']:
+        print(f"  {query} → {', '.join(lookup(index, query)[:5]) or '(none)'}")
+
+    print("\n" + "="*60)
+    print("✓ COMPLETE")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
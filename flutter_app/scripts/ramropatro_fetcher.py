@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited fetching for scrape_ramropatro.py.
+
+- TokenBucket caps the request rate across all worker threads.
+- RamroPatroFetcher keeps one pooled requests.Session per host, retries
+  failed requests with exponential backoff and can record every response
+  body as a fixture.
+- FixtureFetcher replays recorded getMonth / getMBP responses (optionally with
+  simulated latency) for offline runs and benchmarks.
+- fetch_months() runs (year, month) jobs through a thread pool bounded by an
+  explicit concurrency budget and yields results as they complete.
+
+Fixture files are named <endpoint>_<year>_<month>.html, e.g. getMonth_2081_01.html.
+A few recorded months live in fixtures/ramropatro/; `scrape_ramropatro.py
+--check` replays them through FixtureFetcher and checks the parsed result.
+
+requests is only imported once RamroPatroFetcher makes a request, so
+fixture replay works without it installed.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import requests
+
+
+def fixture_name(endpoint: str, year: int, month: int) -> str:
+    return f"{endpoint}_{year}_{month:02d}.html"
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` stored."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RamroPatroFetcher:
+    """HTTP fetcher with per-host connection pools, rate limiting and retries."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict,
+        concurrency: int = 4,
+        rate: float = 4.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 30,
+        record_dir: Optional[Path] = None,
+    ):
+        self.base_url = base_url
+        self.headers = headers
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst=concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.record_dir = record_dir
+        self._sessions: dict[str, "requests.Session"] = {}
+        self._sessions_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.requests_made = 0
+        self.failures = 0
+
+    def _count(self, failed: bool = False) -> None:
+        with self._stats_lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.requests_made += 1
+
+    def _session(self, url: str) -> "requests.Session":
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        host = urlsplit(url).netloc
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def get(self, endpoint: str, year: int, month: int) -> Optional[str]:
+        import requests
+
+        url = f"{self.base_url}/{endpoint}"
+        params = {'year': year, 'month': month, 'a': random.random()}  # Cache buster
+        session = self._session(url)
+
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            self._count()
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                if self.record_dir:
+                    self.record_dir.mkdir(parents=True, exist_ok=True)
+                    (self.record_dir / fixture_name(endpoint, year, month)).write_text(
+                        response.text, encoding='utf-8'
+                    )
+                return response.text
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                retryable = status is None or status == 429 or status >= 500
+                if attempt == self.retries or not retryable:
+                    print(f"  Error fetching {endpoint} for {year}/{month}: {e}")
+                    self._count(failed=True)
+                    return None
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        return None
+
+    def close(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+
+
+class FixtureFetcher:
+    """Replays recorded responses from disk; missing fixtures count as failures."""
+
+    def __init__(self, fixture_dir: Path, latency: float = 0.0, concurrency: int = 4):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.concurrency = concurrency
+        self._stats_lock = threading.Lock()
+        self.requests_made = 0
+        self.failures = 0
+
+    def get(self, endpoint: str, year: int, month: int) -> Optional[str]:
+        if self.latency:
+            time.sleep(self.latency)
+        path = self.fixture_dir / fixture_name(endpoint, year, month)
+        exists = path.exists()
+        with self._stats_lock:
+            self.requests_made += 1
+            if not exists:
+                self.failures += 1
+        if not exists:
+            return None
+        return path.read_text(encoding='utf-8')
+
+    def close(self) -> None:
+        pass
+
+
+def fetch_months(
+    fetcher,
+    months: Iterable[tuple[int, int, bool, bool]],
+) -> Iterator[tuple[int, int, Optional[str], Optional[str]]]:
+    """
+    Fetch (year, month, need_events, need_auspicious) jobs concurrently.
+    Yields (year, month, events_html, auspicious_html) in completion order;
+    an endpoint that was not needed or failed yields None.
+    """
+    def job(year: int, month: int, need_events: bool, need_auspicious: bool):
+        events_html = fetcher.get("getMonth", year, month) if need_events else None
+        auspicious_html = fetcher.get("getMBP", year, month) if need_auspicious else None
+        return year, month, events_html, auspicious_html
+
+    with ThreadPoolExecutor(max_workers=max(1, fetcher.concurrency)) as pool:
+        futures = [pool.submit(job, *m) for m in months]
+        for future in as_completed(futures):
+            yield future.result()
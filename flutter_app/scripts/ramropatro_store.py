@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+SQLite crawl store for scrape_ramropatro.py.
+
+Every fetched month is committed in a single transaction together with its
+raw getMonth / getMBP responses and the parsed records, so an interrupted
+scrape loses at most the months that were in flight. Resuming is a primary
+key range query, and the final JSON files are streamed out of the store in
+calendar order without loading every month into memory.
+
+Each page also keeps a SHA-256 of its body and when it was last checked, so
+a refresh can re-fetch only stale months and skip re-parsing unchanged ones.
+
+Tables:
+    pages      (year, month, endpoint) -> raw response body, hash, fetched_at, checked_at
+    events     (year, month)           -> MonthEvents record as JSON
+    auspicious (year, month)           -> AuspiciousDates record as JSON
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    endpoint TEXT NOT NULL,
+    body TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (year, month, endpoint)
+);
+CREATE TABLE IF NOT EXISTS events (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (year, month)
+);
+CREATE TABLE IF NOT EXISTS auspicious (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (year, month)
+);
+"""
+
+RECORD_TABLES = ("events", "auspicious")
+ENDPOINT_TABLES = {"getMonth": "events", "getMBP": "auspicious"}
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
+
+
+class CrawlStore:
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add hash/checked_at to page tables created before refresh support."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if "hash" in columns:
+            return
+        with self.conn:
+            self.conn.execute("ALTER TABLE pages ADD COLUMN hash TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("ALTER TABLE pages ADD COLUMN checked_at TEXT NOT NULL DEFAULT ''")
+            rows = self.conn.execute("SELECT year, month, endpoint, body, fetched_at FROM pages").fetchall()
+            for year, month, endpoint, body, fetched_at in rows:
+                self.conn.execute(
+                    "UPDATE pages SET hash = ?, checked_at = ? WHERE year = ? AND month = ? AND endpoint = ?",
+                    (content_hash(body), fetched_at, year, month, endpoint),
+                )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def save_month(
+        self,
+        year: int,
+        month: int,
+        events_html: Optional[str] = None,
+        events_record: Optional[dict] = None,
+        auspicious_html: Optional[str] = None,
+        auspicious_record: Optional[dict] = None,
+    ) -> None:
+        """Store one month's raw responses and parsed records atomically."""
+        fetched_at = _now()
+        with self.conn:
+            for endpoint, body in (("getMonth", events_html), ("getMBP", auspicious_html)):
+                if body is not None:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO pages (year, month, endpoint, body, hash, fetched_at, checked_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (year, month, endpoint, body, content_hash(body), fetched_at, fetched_at),
+                    )
+            for table, record in (("events", events_record), ("auspicious", auspicious_record)):
+                if record is not None:
+                    self.conn.execute(
+                        f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)",
+                        (year, month, json.dumps(record, ensure_ascii=False)),
+                    )
+
+    def import_progress(self, progress: dict) -> int:
+        """Load a legacy .scraper_progress.json payload; returns months imported."""
+        with self.conn:
+            for table in RECORD_TABLES:
+                for key, record in progress.get(table, {}).items():
+                    year, month = (int(p) for p in key.split("-"))
+                    self.conn.execute(
+                        f"INSERT OR IGNORE INTO {table} VALUES (?, ?, ?)",
+                        (year, month, json.dumps(record, ensure_ascii=False)),
+                    )
+        return len(progress.get("events", {}))
+
+    def _have(self, table: str, first_year: int, last_year: int) -> set[tuple[int, int]]:
+        rows = self.conn.execute(
+            f"SELECT year, month FROM {table} WHERE year BETWEEN ? AND ?",
+            (first_year, last_year),
+        )
+        return set(rows)
+
+    def pending(self, months: Iterable[tuple[int, int]]) -> list[tuple[int, int, bool, bool]]:
+        """(year, month, need_events, need_auspicious) for months missing either record."""
+        months = list(months)
+        if not months:
+            return []
+        first_year, last_year = months[0][0], months[-1][0]
+        have_events = self._have("events", first_year, last_year)
+        have_auspicious = self._have("auspicious", first_year, last_year)
+
+        jobs = []
+        for ym in months:
+            need_events = ym not in have_events
+            need_auspicious = ym not in have_auspicious
+            if need_events or need_auspicious:
+                jobs.append((*ym, need_events, need_auspicious))
+        return jobs
+
+    def page_hash(self, year: int, month: int, endpoint: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT hash FROM pages WHERE year = ? AND month = ? AND endpoint = ?",
+            (year, month, endpoint),
+        ).fetchone()
+        return row[0] if row else None
+
+    def touch(self, year: int, month: int, endpoint: str) -> None:
+        """Mark a page as re-checked without changing its content."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE pages SET checked_at = ? WHERE year = ? AND month = ? AND endpoint = ?",
+                (_now(), year, month, endpoint),
+            )
+
+    def stale(
+        self,
+        months: Iterable[tuple[int, int]],
+        max_age: Callable[[int, int], timedelta],
+    ) -> list[tuple[int, int, bool, bool]]:
+        """
+        Refresh jobs for months whose pages were last checked longer than
+        max_age(year, month) ago, or never fetched at all.
+        """
+        months = list(months)
+        if not months:
+            return []
+        checked: dict[tuple[int, int, str], datetime] = {}
+        for year, month, endpoint, checked_at in self.conn.execute(
+            "SELECT year, month, endpoint, checked_at FROM pages WHERE year BETWEEN ? AND ?",
+            (months[0][0], months[-1][0]),
+        ):
+            checked[(year, month, endpoint)] = datetime.fromisoformat(checked_at)
+
+        now = datetime.now(tz=timezone.utc)
+        jobs = []
+        for year, month in months:
+            cutoff = now - max_age(year, month)
+            need = [
+                checked.get((year, month, endpoint), datetime.min.replace(tzinfo=timezone.utc)) < cutoff
+                for endpoint in ENDPOINT_TABLES
+            ]
+            if any(need):
+                jobs.append((year, month, *need))
+        return jobs
+
+    def record(self, table: str, year: int, month: int) -> Optional[dict]:
+        row = self.conn.execute(
+            f"SELECT record FROM {table} WHERE year = ? AND month = ?", (year, month)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, table: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def iter_records(self, table: str) -> Iterator[tuple[str, str]]:
+        """("YYYY-MM", record JSON) in calendar order."""
+        for year, month, record in self.conn.execute(
+            f"SELECT year, month, record FROM {table} ORDER BY year, month"
+        ):
+            yield f"{year}-{month:02d}", record
+
+    def export(self, table: str, path: Path) -> int:
+        """
+        Stream one record table to `path` as the same indent=2 JSON object
+        json.dump would produce, replacing the file atomically. Symlinked
+        outputs (assets/data -> data/) are resolved so the link survives.
+        """
+        path = path.resolve()
+        tmp = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("{")
+            for key, record in self.iter_records(table):
+                body = json.dumps(json.loads(record), ensure_ascii=False, indent=2)
+                f.write(("," if count else "") + f"\n  {json.dumps(key)}: " + body.replace("\n", "\n  "))
+                count += 1
+            f.write("\n}" if count else "}")
+        os.replace(tmp, path)
+        return count
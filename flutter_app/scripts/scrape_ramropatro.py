@@ -5,21 +5,33 @@ Fetches events, holidays, and auspicious dates (lagan, sahit) for Nepali calenda
 
 Usage:
     python scrape_ramropatro.py
+    python scrape_ramropatro.py --concurrency 8 --rate 6
+    python scrape_ramropatro.py --record fixtures/           # Save raw responses while scraping
+    python scrape_ramropatro.py --fixtures fixtures/         # Replay saved responses offline
+    python scrape_ramropatro.py --benchmark fixtures/ --latency 0.3
+    python scrape_ramropatro.py --refresh                     # Re-fetch only stale months
+    python scrape_ramropatro.py --check                       # Parse the committed fixtures offline
 
 Output:
     - nepali_calendar_events.json: Events and holidays for each month
     - nepali_calendar_auspicious.json: Auspicious dates (bibaha lagan, pasni, bratabandha)
 """
 
+import argparse
 import json
 import re
+import sys
 import time
-import random
-import requests
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Optional
 from dataclasses import dataclass, asdict
 
+from ramropatro_fetcher import FixtureFetcher, RamroPatroFetcher, fetch_months
+from ramropatro_store import CrawlStore, content_hash
+
+# BS <-> AD conversion is shared with the repository-level data scripts
+ROOT_SCRIPTS = Path(__file__).resolve().parent.parent.parent / "scripts"
+
 
 # Configuration
 START_YEAR = 2068
@@ -28,6 +40,8 @@ END_YEAR = 2084
 END_MONTH = 12
 
 OUTPUT_DIR = Path(__file__).parent.parent / "assets" / "data"
+STORE_FILE = ".scraper_state.db"
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "ramropatro"
 
 HEADERS = {
     'accept': '*/*',
@@ -39,6 +53,14 @@ HEADERS = {
 
 BASE_URL = "https://ramropatro.com"
 
+# Refresh policy: how long a month's pages stay fresh, by distance from the
+# current BS month. Upcoming months get holidays and lagan dates filled in or
+# corrected; past months rarely change.
+NEAR_WINDOW_MONTHS = 6
+NEAR_MAX_AGE = timedelta(days=1)      # last month .. current + window
+FUTURE_MAX_AGE = timedelta(days=7)    # further ahead
+PAST_MAX_AGE = timedelta(days=90)     # historical
+
 
 @dataclass
 class DayEvent:
@@ -158,135 +180,247 @@ def extract_numbers(text: str) -> list[int]:
     return [int(n) for n in numbers if 1 <= int(n) <= 32]
 
 
-def fetch_month_events(year: int, month: int) -> Optional[str]:
-    """Fetch month events from ramropatro API"""
-    url = f"{BASE_URL}/getMonth"
-    params = {
-        'year': year,
-        'month': month,
-        'a': random.random()  # Cache buster
-    }
+def scrape_all(fetcher, output_dir: Path = OUTPUT_DIR):
+    """Main scraping function"""
+    # Ensure output directory exists
+    output_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"  Error fetching events for {year}/{month}: {e}")
-        return None
-
-
-def fetch_auspicious_dates(year: int, month: int) -> Optional[str]:
-    """Fetch auspicious dates from ramropatro API"""
-    url = f"{BASE_URL}/getMBP"
-    params = {
-        'year': year,
-        'month': month,
-        'a': random.random()
-    }
+    # Crawl store for resumption; every month is committed as soon as it is parsed
+    store = CrawlStore(output_dir / STORE_FILE)
 
-    try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        return response.text
-    except requests.RequestException as e:
-        print(f"  Error fetching auspicious dates for {year}/{month}: {e}")
-        return None
+    legacy_progress = output_dir / ".scraper_progress.json"
+    if legacy_progress.exists():
+        with open(legacy_progress, 'r') as f:
+            imported = store.import_progress(json.load(f))
+        legacy_progress.unlink()
+        print(f"Imported {imported} months from {legacy_progress.name}")
 
+    total_months = (END_YEAR - START_YEAR) * 12 + (END_MONTH - START_MONTH + 1)
+    jobs = store.pending(iter_months())
 
-def scrape_all():
-    """Main scraping function"""
-    all_events = {}
-    all_auspicious = {}
+    print(f"{total_months - len(jobs)} months already fetched, {len(jobs)} to fetch "
+          f"with concurrency {fetcher.concurrency}")
 
-    # Ensure output directory exists
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    for current, (year, month, events_html, auspicious_html) in enumerate(fetch_months(fetcher, jobs), 1):
+        print(f"[{current}/{len(jobs)}] Fetched {year}/{month}")
+        events_record = auspicious_record = None
 
-    # Progress file for resumption
-    progress_file = OUTPUT_DIR / ".scraper_progress.json"
+        if events_html:
+            month_events = parse_month_events(events_html, year, month)
+            events_record = asdict(month_events)
+            print(f"  Found {len(month_events.days)} days with events")
 
-    # Load existing progress if any
-    if progress_file.exists():
-        with open(progress_file, 'r') as f:
-            progress = json.load(f)
-            all_events = progress.get('events', {})
-            all_auspicious = progress.get('auspicious', {})
-            print(f"Resuming from previous run. Already have {len(all_events)} months.")
+        if auspicious_html:
+            auspicious = parse_auspicious_dates(auspicious_html, year, month)
+            auspicious_record = asdict(auspicious)
+            bibaha_count = len(auspicious.bibaha_lagan)
+            print(f"  Found {bibaha_count} bibaha lagan dates")
 
-    total_months = (END_YEAR - START_YEAR) * 12 + (END_MONTH - START_MONTH + 1)
-    current = 0
+        store.save_month(year, month, events_html, events_record, auspicious_html, auspicious_record)
+
+    elapsed = time.perf_counter() - started
+    print(f"\nFetched {len(jobs)} months with {fetcher.requests_made} requests "
+          f"({fetcher.failures} failed) in {elapsed:.1f}s")
+
+    # Stream final output files from the store in calendar order
+    events_file = output_dir / "nepali_calendar_events.json"
+    auspicious_file = output_dir / "nepali_calendar_auspicious.json"
+
+    months = store.export("events", events_file)
+    print(f"\nSaved events to {events_file}")
+
+    store.export("auspicious", auspicious_file)
+    print(f"Saved auspicious dates to {auspicious_file}")
 
+    store.close()
+
+    print(f"\nDone! Scraped {months} months from {START_YEAR}/{START_MONTH} to {END_YEAR}/{END_MONTH}")
+
+
+def iter_months():
+    """All (year, month) pairs in the configured range"""
     for year in range(START_YEAR, END_YEAR + 1):
         start_m = START_MONTH if year == START_YEAR else 1
         end_m = END_MONTH if year == END_YEAR else 12
-
         for month in range(start_m, end_m + 1):
-            current += 1
-            key = f"{year}-{month:02d}"
+            yield year, month
 
-            # Skip if already fetched
-            if key in all_events and key in all_auspicious:
-                print(f"[{current}/{total_months}] Skipping {year}/{month} (already fetched)")
-                continue
 
-            print(f"[{current}/{total_months}] Fetching {year}/{month}...")
-
-            # Fetch events
-            if key not in all_events:
-                events_html = fetch_month_events(year, month)
-                if events_html:
-                    month_events = parse_month_events(events_html, year, month)
-                    all_events[key] = asdict(month_events)
-                    print(f"  Found {len(month_events.days)} days with events")
-
-            # Fetch auspicious dates
-            if key not in all_auspicious:
-                auspicious_html = fetch_auspicious_dates(year, month)
-                if auspicious_html:
-                    auspicious = parse_auspicious_dates(auspicious_html, year, month)
-                    all_auspicious[key] = asdict(auspicious)
-                    bibaha_count = len(auspicious.bibaha_lagan)
-                    print(f"  Found {bibaha_count} bibaha lagan dates")
-
-            # Save progress periodically
-            if current % 10 == 0:
-                save_progress(progress_file, all_events, all_auspicious)
-
-            # Rate limiting - be nice to the server
-            time.sleep(0.5 + random.random() * 0.5)
-
-    # Final save
-    save_progress(progress_file, all_events, all_auspicious)
-
-    # Save final output files
-    events_file = OUTPUT_DIR / "nepali_calendar_events.json"
-    auspicious_file = OUTPUT_DIR / "nepali_calendar_auspicious.json"
-
-    with open(events_file, 'w', encoding='utf-8') as f:
-        json.dump(all_events, f, ensure_ascii=False, indent=2)
-    print(f"\nSaved events to {events_file}")
+def current_bs_month(today: date | None = None) -> tuple[int, int]:
+    """BS (year, month) of an AD date (default: today), from data/bs_calendar_data.json"""
+    if str(ROOT_SCRIPTS) not in sys.path:
+        sys.path.append(str(ROOT_SCRIPTS))
+    from bs_calendar import BsCalendar
+
+    bs = BsCalendar.load().ad_to_bs(today or date.today())
+    return bs.year, bs.month
 
-    with open(auspicious_file, 'w', encoding='utf-8') as f:
-        json.dump(all_auspicious, f, ensure_ascii=False, indent=2)
-    print(f"Saved auspicious dates to {auspicious_file}")
 
-    # Clean up progress file
-    progress_file.unlink(missing_ok=True)
+def refresh_max_age(year: int, month: int, current: tuple[int, int], window: int) -> timedelta:
+    distance = (year - current[0]) * 12 + (month - current[1])
+    if -1 <= distance <= window:
+        return NEAR_MAX_AGE
+    if distance > window:
+        return FUTURE_MAX_AGE
+    return PAST_MAX_AGE
 
-    print(f"\nDone! Scraped {len(all_events)} months from {START_YEAR}/{START_MONTH} to {END_YEAR}/{END_MONTH}")
 
+def record_items(table: str, record: dict | None) -> set:
+    """Flatten a parsed month into comparable items for change summaries"""
+    if not record:
+        return set()
+    if table == "events":
+        return {(d['day'], e, d['is_holiday']) for d in record['days'] for e in d['events']}
+    return {(k, d) for k in ('bibaha_lagan', 'bratabandha', 'pasni') for d in record[k]}
 
-def save_progress(progress_file: Path, events: dict, auspicious: dict):
-    """Save progress to allow resumption"""
-    with open(progress_file, 'w', encoding='utf-8') as f:
-        json.dump({'events': events, 'auspicious': auspicious}, f, ensure_ascii=False)
+
+def refresh(fetcher, output_dir: Path = OUTPUT_DIR, window: int = NEAR_WINDOW_MONTHS):
+    """Re-fetch stale months and rewrite output only if a month's content changed"""
+    store = CrawlStore(output_dir / STORE_FILE)
+    current = current_bs_month()
+    jobs = store.stale(iter_months(), lambda y, m: refresh_max_age(y, m, current, window))
+
+    print(f"Current BS month {current[0]}/{current[1]}; {len(jobs)} stale months to re-check "
+          f"with concurrency {fetcher.concurrency}")
+
+    parsers = {
+        "events": ("getMonth", parse_month_events),
+        "auspicious": ("getMBP", parse_auspicious_dates),
+    }
+    unchanged = 0
+    changes: dict[str, list[str]] = {"events": [], "auspicious": []}
+
+    started = time.perf_counter()
+    for year, month, events_html, auspicious_html in fetch_months(fetcher, jobs):
+        key = f"{year}-{month:02d}"
+        pages = {"events": events_html, "auspicious": auspicious_html}
+        records = {}
+
+        for table, (endpoint, parse) in parsers.items():
+            html = pages[table]
+            if html is None:
+                continue
+            if content_hash(html) == store.page_hash(year, month, endpoint):
+                store.touch(year, month, endpoint)
+                pages[table] = None
+                unchanged += 1
+                continue
+
+            old = store.record(table, year, month)
+            records[table] = asdict(parse(html, year, month))
+            old_items, new_items = record_items(table, old), record_items(table, records[table])
+            if old is None:
+                changes[table].append(f"{key}: new ({len(new_items)} items)")
+            elif old != records[table]:
+                changes[table].append(
+                    f"{key}: +{len(new_items - old_items)} / -{len(old_items - new_items)} items"
+                )
+
+        store.save_month(
+            year, month,
+            pages["events"], records.get("events"),
+            pages["auspicious"], records.get("auspicious"),
+        )
+
+    elapsed = time.perf_counter() - started
+    print(f"\nRe-checked {len(jobs)} months with {fetcher.requests_made} requests "
+          f"({fetcher.failures} failed) in {elapsed:.1f}s; {unchanged} pages unchanged")
+
+    outputs = {
+        "events": output_dir / "nepali_calendar_events.json",
+        "auspicious": output_dir / "nepali_calendar_auspicious.json",
+    }
+    for table, changed in changes.items():
+        if not changed:
+            print(f"\n{table}: no changes, {outputs[table].name} left untouched")
+            continue
+        print(f"\n{table}: {len(changed)} months changed")
+        for line in changed:
+            print(f"  {line}")
+        store.export(table, outputs[table])
+        print(f"Saved {table} to {outputs[table]}")
+
+    store.close()
+
+
+def benchmark(fixture_dir: Path, latency: float, concurrency: int):
+    """Compare sequential and concurrent fetching over recorded fixtures"""
+    jobs = [(year, month, True, True) for year, month in iter_months()]
+
+    for workers in sorted({1, concurrency}):
+        fetcher = FixtureFetcher(fixture_dir, latency=latency, concurrency=workers)
+        started = time.perf_counter()
+        for _, _, events_html, auspicious_html in fetch_months(fetcher, jobs):
+            if events_html:
+                parse_month_events(events_html, 0, 0)
+            if auspicious_html:
+                parse_auspicious_dates(auspicious_html, 0, 0)
+        elapsed = time.perf_counter() - started
+        print(f"concurrency {workers:>2}: {len(jobs)} months, {fetcher.requests_made} requests "
+              f"({fetcher.failures} missing) in {elapsed:.2f}s = {len(jobs) / elapsed:.1f} months/s")
+
+
+def check_fixtures(fixture_dir: Path = FIXTURE_DIR, concurrency: int = 4):
+    """Replay recorded responses through FixtureFetcher and compare the parses with expected.json"""
+    with open(fixture_dir / "expected.json", 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    jobs = [(int(key[:4]), int(key[5:]), True, True) for key in sorted(expected)]
+
+    fetcher = FixtureFetcher(fixture_dir, concurrency=concurrency)
+    checked = 0
+    for year, month, events_html, auspicious_html in fetch_months(fetcher, jobs):
+        key = f"{year}-{month:02d}"
+        assert events_html is not None and auspicious_html is not None, f"{key}: missing fixture"
+        events = asdict(parse_month_events(events_html, year, month))
+        assert events == expected[key]["events"], f"{key}: getMonth parsed differently"
+        auspicious = asdict(parse_auspicious_dates(auspicious_html, year, month))
+        assert auspicious == expected[key]["auspicious"], f"{key}: getMBP parsed differently"
+        checked += 1
+
+    assert checked == len(jobs) and fetcher.failures == 0
+    print(f"OK: {checked} months parsed from {fetcher.requests_made} recorded responses")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape calendar data from ramropatro.com")
+    parser.add_argument("--concurrency", type=int, default=4, help="Months fetched in parallel")
+    parser.add_argument("--rate", type=float, default=4.0, help="Maximum requests per second")
+    parser.add_argument("--record", type=Path, metavar="DIR", help="Save raw responses as fixtures")
+    parser.add_argument("--fixtures", type=Path, metavar="DIR", help="Replay saved responses instead of fetching")
+    parser.add_argument("--benchmark", type=Path, metavar="DIR", help="Time fixture replay at concurrency 1 vs --concurrency")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per fixture request")
+    parser.add_argument("--refresh", action="store_true", help="Re-fetch stale months and report changes")
+    parser.add_argument("--window", type=int, default=NEAR_WINDOW_MONTHS,
+                        help="Months ahead of today refreshed daily in --refresh mode")
+    parser.add_argument("--check", nargs="?", type=Path, const=FIXTURE_DIR, metavar="DIR",
+                        help="Parse recorded fixtures offline and compare with DIR/expected.json")
+    args = parser.parse_args()
+
+    if args.check:
+        check_fixtures(args.check, args.concurrency)
+        raise SystemExit
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.latency, args.concurrency)
+        raise SystemExit
+
     print("=" * 60)
     print("Ramropatro Calendar Scraper")
     print(f"Scraping from BS {START_YEAR}/{START_MONTH} to {END_YEAR}/{END_MONTH}")
     print("=" * 60)
     print()
 
-    scrape_all()
+    if args.fixtures:
+        fetcher = FixtureFetcher(args.fixtures, latency=args.latency, concurrency=args.concurrency)
+    else:
+        fetcher = RamroPatroFetcher(
+            BASE_URL, HEADERS, concurrency=args.concurrency, rate=args.rate, record_dir=args.record
+        )
+    try:
+        if args.refresh:
+            refresh(fetcher, window=args.window)
+        else:
+            scrape_all(fetcher)
+    finally:
+        fetcher.close()
@@ -2,9 +2,20 @@
 """
 Script to add Nepali translations (events_np) to calendar events JSON.
 Uses a mapping dictionary of common event names to their Nepali equivalents.
+
+Usage:
+    python translate_calendar_events.py
+    python translate_calendar_events.py --incremental  # Only days whose events changed
+    python translate_calendar_events.py --benchmark    # Compare translators over all events
 """
 
+import argparse
+import hashlib
 import json
+import os
+import re
+import time
+from collections import deque
 from pathlib import Path
 
 # Mapping of English event names to Nepali translations
@@ -1397,25 +1408,168 @@ EVENT_TRANSLATIONS = {
 }
 
 
+class EventTranslator:
+    """
+    Longest-match-first phrase replacement with an Aho–Corasick automaton.
+
+    Equivalent to applying str.replace for every phrase in order of
+    decreasing length (ties in table order): all phrase occurrences are found
+    in one pass over the name, then accepted by that priority while skipping
+    any that overlap an already accepted one. No phrase can match across an
+    inserted Nepali translation (they share only spaces and punctuation), so
+    matching the original text once sees exactly what the repeated replaces
+    would. Results are memoized per event name.
+    """
+
+    def __init__(self, translations: dict[str, str]):
+        self.translations = translations
+        ordered = sorted(translations, key=lambda k: -len(k))
+        self.phrases = ordered
+        self.rank = {phrase: i for i, phrase in enumerate(ordered)}
+
+        # Trie: goto[node][char] -> node; out[node] lists phrase ranks ending there
+        self.goto: list[dict[str, int]] = [{}]
+        self.out: list[list[int]] = [[]]
+        for i, phrase in enumerate(ordered):
+            node = 0
+            for ch in phrase:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(i)
+
+        # Failure links, breadth-first; outputs of suffix states are merged in
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self.fail[node]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+        self._cache: dict[str, str] = {}
+
+    def matches(self, text: str) -> list[tuple[int, int, int]]:
+        """All (rank, start, end) phrase occurrences in text."""
+        found = []
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for i in self.out[node]:
+                found.append((i, pos + 1 - len(self.phrases[i]), pos + 1))
+        return found
+
+    def translate(self, event_name: str) -> str:
+        cached = self._cache.get(event_name)
+        if cached is not None:
+            return cached
+
+        if event_name in self.translations:
+            result = self.translations[event_name]
+        else:
+            accepted: list[tuple[int, int, int]] = []
+            for rank, start, end in sorted(self.matches(event_name)):
+                if all(end <= s or start >= e for _, s, e in accepted):
+                    accepted.append((rank, start, end))
+
+            parts = []
+            pos = 0
+            for rank, start, end in sorted(accepted, key=lambda m: m[1]):
+                parts.append(event_name[pos:start])
+                parts.append(self.translations[self.phrases[rank]])
+                pos = end
+            parts.append(event_name[pos:])
+            result = ''.join(parts)
+
+        self._cache[event_name] = result
+        return result
+
+
+_translator: EventTranslator | None = None
+
+
 def translate_event(event_name: str) -> str:
     """
     Translate an event name from English to Nepali.
     Uses exact matching first, then partial matching for compound names.
+    If no translation is found the original is returned (it might already
+    be in transliterated Nepali).
     """
-    # Check for exact match
+    global _translator
+    if _translator is None:
+        _translator = EventTranslator(EVENT_TRANSLATIONS)
+    return _translator.translate(event_name)
+
+
+def translate_event_sequential(event_name: str) -> str:
+    """Reference implementation: one str.replace per phrase, longest first."""
     if event_name in EVENT_TRANSLATIONS:
         return EVENT_TRANSLATIONS[event_name]
 
-    # Try partial matching for compound names
     translated = event_name
     for eng, nep in sorted(EVENT_TRANSLATIONS.items(), key=lambda x: -len(x[0])):
         if eng in translated:
             translated = translated.replace(eng, nep)
-
-    # If no translation found, return original (it might already be in transliterated Nepali)
     return translated
 
 
+def benchmark(input_path: Path):
+    """Time both translators over every event in the JSON and check they agree"""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    events = [e for m in data.values() for d in m.get('days', []) for e in d.get('events', [])]
+    unique = set(events)
+
+    started = time.perf_counter()
+    expected = {e: translate_event_sequential(e) for e in unique}
+    sequential = time.perf_counter() - started
+
+    started = time.perf_counter()
+    translator = EventTranslator(EVENT_TRANSLATIONS)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = [translator.translate(e) for e in events]
+    automaton = time.perf_counter() - started
+
+    mismatches = [e for e, t in zip(events, actual) if t != expected[e]]
+    print(f"{len(events):,} events ({len(unique):,} unique), {len(EVENT_TRANSLATIONS):,} phrases")
+    print(f"  sequential replace: {sequential * 1000:8.1f} ms (unique events only)")
+    print(f"  automaton build:    {build * 1000:8.1f} ms ({len(translator.goto):,} states)")
+    print(f"  automaton + memo:   {automaton * 1000:8.1f} ms (all events)")
+    print(f"  mismatches: {len(mismatches)}")
+    for e in mismatches[:10]:
+        print(f"    {e!r}: {expected[e]!r} != {translator.translate(e)!r}")
+
+
+def is_devanagari(text: str) -> bool:
+    return any(ord(c) >= 0x0900 and ord(c) <= 0x097F for c in text)
+
+
+def translate_day(day_data: dict, untranslated: set) -> list[str]:
+    """Translate one day's events, collecting names that had no translation."""
+    events_np = []
+    for event in day_data['events']:
+        translated = translate_event(event)
+        events_np.append(translated)
+
+        # Track events that weren't translated
+        if translated == event and not is_devanagari(event):
+            untranslated.add(event)
+    return events_np
+
+
 def process_calendar_events(input_path: Path, output_path: Path):
     """
     Process the calendar events JSON file and add events_np field.
@@ -1434,18 +1588,7 @@ def process_calendar_events(input_path: Path, output_path: Path):
             if 'events' not in day_data:
                 continue
 
-            events = day_data['events']
-            events_np = []
-
-            for event in events:
-                translated = translate_event(event)
-                events_np.append(translated)
-
-                # Track events that weren't translated
-                if translated == event and not any(ord(c) >= 0x0900 and ord(c) <= 0x097F for c in event):
-                    untranslated.add(event)
-
-            day_data['events_np'] = events_np
+            day_data['events_np'] = translate_day(day_data, untranslated)
 
     # Write output
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -1459,9 +1602,108 @@ def process_calendar_events(input_path: Path, output_path: Path):
             print(f"  - {event}")
 
 
+# Top-level "YYYY-MM" keys of a json.dump(indent=2) file
+MONTH_KEY = re.compile(r'^  "(\d{4}-\d{2})": ', re.M)
+
+
+def split_months(text: str) -> dict[str, str] | None:
+    """
+    Serialized value of every month in an indent=2 events file, or None if
+    the file is not laid out that way.
+    """
+    matches = list(MONTH_KEY.finditer(text))
+    if not matches or not text.endswith('\n}'):
+        return None
+    chunks = {}
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        end = nxt.start() - 2 if nxt else len(text) - 2
+        chunks[m.group(1)] = text[m.end():end]
+    return chunks
+
+
+def content_hash(value) -> str:
+    return hashlib.sha1(json.dumps(value, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def process_incremental(path: Path, state_path: Path):
+    """
+    Translate in place, skipping days whose events are unchanged since the
+    last run (per-day hashes kept in state_path). Only months with changed
+    translations are re-serialized; every other month keeps its original
+    bytes. Editing EVENT_TRANSLATIONS invalidates all stored hashes.
+    """
+    path = path.resolve()
+    text = path.read_text(encoding='utf-8')
+    data = json.loads(text)
+
+    state = {}
+    if state_path.exists():
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    table_hash = content_hash(EVENT_TRANSLATIONS)
+    if state.get('table') != table_hash:
+        state = {'table': table_hash, 'days': {}, 'untranslated': []}
+
+    untranslated = set()
+    changed_months = set()
+    translated_days = skipped_days = 0
+
+    for month_key, month_data in data.items():
+        hashes = state['days'].setdefault(month_key, {})
+        for i, day_data in enumerate(month_data.get('days', [])):
+            if 'events' not in day_data:
+                continue
+            day_hash = content_hash(day_data['events'])
+            if hashes.get(str(i)) == day_hash and len(day_data.get('events_np', [])) == len(day_data['events']):
+                skipped_days += 1
+                continue
+
+            events_np = translate_day(day_data, untranslated)
+            translated_days += 1
+            hashes[str(i)] = day_hash
+            if day_data.get('events_np') != events_np:
+                day_data['events_np'] = events_np
+                changed_months.add(month_key)
+
+    chunks = split_months(text)
+    if changed_months:
+        if chunks is None or list(chunks) != list(data):
+            output = json.dumps(data, ensure_ascii=False, indent=2)
+        else:
+            for key in changed_months:
+                chunks[key] = json.dumps(data[key], ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            output = '{\n' + ',\n'.join(f'  "{key}": {value}' for key, value in chunks.items()) + '\n}'
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(output, encoding='utf-8')
+        os.replace(tmp, path)
+
+    new_untranslated = sorted(untranslated - set(state['untranslated']))
+    state['untranslated'] = sorted(untranslated | set(state['untranslated']))
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+    print(f"Translated {translated_days} days, skipped {skipped_days} unchanged; "
+          f"{len(changed_months)} months rewritten in {path}")
+
+    if new_untranslated:
+        print(f"\nNew untranslated events ({len(new_untranslated)}):")
+        for event in new_untranslated:
+            print(f"  - {event}")
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Add Nepali translations to calendar events")
+    parser.add_argument('--incremental', action='store_true', help="Only translate days whose events changed")
+    parser.add_argument('--benchmark', action='store_true', help="Compare translators over all events")
+    args = parser.parse_args()
+
     script_dir = Path(__file__).parent
     input_file = script_dir.parent / 'assets' / 'data' / 'nepali_calendar_events.json'
     output_file = input_file  # Overwrite the same file
 
-    process_calendar_events(input_file, output_file)
+    if args.benchmark:
+        benchmark(input_file)
+    elif args.incremental:
+        process_incremental(input_file, input_file.parent / '.translation_state.json')
+    else:
+        process_calendar_events(input_file, output_file)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Add BS (Bikram Sambat) companion fields to AD timestamps in a JSON asset.
+
+Every value matched by a field path gets a sibling "<field>_bs" holding the
+BS date ("YYYY-MM-DD") of that moment in Nepal time. Values are parsed to
+Nepal-time day ordinals and converted with one vectorized lookup per batch;
+large files are split into shards converted in parallel processes. Without
+numpy each distinct day is converted with BsCalendar's bisect instead.
+
+Field paths are dot-separated keys; "[]" steps into every list element and
+"*" into every value of an object (skipping existing "_bs" companions, so
+re-runs are idempotent). A final "key[]" step converts a list of timestamps
+into a parallel "key_bs" list, with null where a value is unparseable.
+
+Accepted values:
+    1771398394                              Unix seconds (milliseconds if > 1e11)
+    "2026-02-18T07:25:05.398095+00:00"      ISO 8601 with offset
+    "2026-01-28 07:19:34 UTC"               scraped_at style
+    "2026-02-18 13:10", "2026-01-17"        naive values are taken as Nepal time
+
+Usage:
+    python3 scripts/annotate_bs_dates.py data/ronb_feed.json scraped_at posts[].timestamp
+    python3 scripts/annotate_bs_dates.py assets/data/leaders.json version
+    python3 scripts/annotate_bs_dates.py flutter_app/assets/data/election/local_election_results.json scraped_at
+    python3 scripts/annotate_bs_dates.py big.json items[].created --workers 8 -o annotated.json
+    python3 scripts/annotate_bs_dates.py schedule.json "events[].dates[]"
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from bs_calendar import BsCalendar, UNIX_EPOCH_ORDINAL, np
+
+NEPAL_TZ = timezone(timedelta(hours=5, minutes=45))
+NEPAL_OFFSET_SECONDS = 5 * 3600 + 45 * 60
+MAX_SECONDS = 1e15  # ~30 million years: far outside the BS table, well inside int64 days
+
+# Values per process shard; smaller inputs are converted in-process
+SHARD_SIZE = 50_000
+
+
+def find_fields(data, path: list[str]) -> list[tuple[dict, str, int | None]]:
+    """
+    (parent object, key, list index) for every value matched by a split field
+    path; the index is None unless the last step is "key[]".
+    """
+    nodes = [data]
+    for step in path[:-1]:
+        children = []
+        for node in nodes:
+            if step.endswith("[]"):
+                key = step[:-2]
+                items = node if not key else node.get(key) if isinstance(node, dict) else None
+                if isinstance(items, list):
+                    children.extend(items)
+            elif step == "*":
+                if isinstance(node, dict):
+                    children.extend(node.values())
+            elif isinstance(node, dict) and step in node:
+                children.append(node[step])
+        nodes = children
+
+    last = path[-1]
+    targets = []
+    for node in nodes:
+        if not isinstance(node, dict):
+            continue
+        if last == "*":
+            targets.extend((node, key, None) for key in list(node) if not key.endswith("_bs"))
+        elif last.endswith("[]"):
+            items = node.get(last[:-2])
+            if isinstance(items, list):
+                targets.extend((node, last[:-2], i) for i in range(len(items)))
+        elif last in node:
+            targets.append((node, last, None))
+    return targets
+
+
+@lru_cache(maxsize=65536)
+def parse_npt_ordinal(text: str) -> int | None:
+    """Ordinal of the Nepal-time date of a timestamp string; scrape stamps repeat, so cached."""
+    text = text.strip()
+    try:
+        if text.endswith(" UTC"):
+            moment = datetime.strptime(text[:-4], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        else:
+            moment = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(NEPAL_TZ)
+    return moment.toordinal()
+
+
+def npt_ordinal(value) -> int | None:
+    """Nepal-time date ordinal of one timestamp; the scalar path used without numpy."""
+    if isinstance(value, str):
+        return parse_npt_ordinal(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        seconds = value / 1000 if value > 1e11 else value
+        return math.floor((seconds + NEPAL_OFFSET_SECONDS) / 86400) + UNIX_EPOCH_ORDINAL
+    return None
+
+
+def npt_ordinals(values: list):
+    """Nepal-time date ordinals for a batch of timestamps, -1 where unparseable."""
+    ordinals = np.full(len(values), -1, dtype=np.int64)
+
+    # Unix timestamps are converted as one array
+    numeric = [i for i, v in enumerate(values) if isinstance(v, (int, float)) and not isinstance(v, bool)]
+    if numeric:
+        seconds = np.asarray([values[i] for i in numeric], dtype=np.float64)
+        seconds = np.where(seconds > 1e11, seconds / 1000, seconds)
+        # inf, nan and stamps millions of years out stay -1 instead of overflowing the cast
+        sane = np.isfinite(seconds) & (np.abs(seconds) < MAX_SECONDS)
+        days = np.floor((seconds[sane] + NEPAL_OFFSET_SECONDS) / 86400).astype(np.int64)
+        ordinals[np.asarray(numeric)[sane]] = days + UNIX_EPOCH_ORDINAL
+
+    for i, v in enumerate(values):
+        if isinstance(v, str):
+            ordinal = parse_npt_ordinal(v)
+            if ordinal is not None:
+                ordinals[i] = ordinal
+    return ordinals
+
+
+_calendar: BsCalendar | None = None
+
+
+def _worker_calendar() -> BsCalendar:
+    global _calendar
+    if _calendar is None:
+        _calendar = BsCalendar.load()
+    return _calendar
+
+
+def convert_values(values: list) -> list[str | None]:
+    """BS date strings for a batch of timestamps; None where unparseable or out of range."""
+    calendar = _worker_calendar()
+    if np is None:
+        return _convert_values_python(values, calendar)
+    ordinals = npt_ordinals(values)
+    first = calendar.epoch_ordinal
+    valid = (ordinals >= first) & (ordinals < first + calendar.total_days)
+
+    # Timestamps cluster on few days: convert and format each distinct day once
+    unique, inverse = np.unique(ordinals[valid], return_inverse=True)
+    years, months, days = calendar.ordinal_to_bs_array(unique)
+    labels = [f"{y:04d}-{m:02d}-{d:02d}" for y, m, d in zip(years.tolist(), months.tolist(), days.tolist())]
+
+    result: list[str | None] = [None] * len(values)
+    for i, j in zip(np.flatnonzero(valid).tolist(), inverse.tolist()):
+        result[i] = labels[j]
+    return result
+
+
+def _convert_values_python(values: list, calendar: BsCalendar) -> list[str | None]:
+    first = calendar.epoch_ordinal
+    labels: dict[int, str] = {}
+    result: list[str | None] = []
+    for value in values:
+        ordinal = npt_ordinal(value)
+        if ordinal is None or not first <= ordinal < first + calendar.total_days:
+            result.append(None)
+            continue
+        if ordinal not in labels:
+            labels[ordinal] = str(calendar.ordinal_to_bs(ordinal))
+        result.append(labels[ordinal])
+    return result
+
+
+def convert_sharded(values: list, workers: int) -> list[str | None]:
+    if workers <= 1 or len(values) <= SHARD_SIZE:
+        return convert_values(values)
+    shards = [values[i:i + SHARD_SIZE] for i in range(0, len(values), SHARD_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [bs for shard in pool.map(convert_values, shards) for bs in shard]
+
+
+def annotate(data, paths: list[str], workers: int = 1) -> tuple[int, int]:
+    """Write "<field>_bs" siblings in place; returns (annotated, skipped)."""
+    targets = [t for path in paths for t in find_fields(data, path.split("."))]
+    values = [parent[key] if index is None else parent[key][index] for parent, key, index in targets]
+    converted = convert_sharded(values, workers)
+
+    skipped = 0
+    for (parent, key, index), bs in zip(targets, converted):
+        if bs is None:
+            skipped += 1
+        if index is not None:
+            # List targets come in order, so index 0 starts a fresh companion list
+            if index == 0:
+                parent[f"{key}_bs"] = [None] * len(parent[key])
+            parent[f"{key}_bs"][index] = bs
+        elif bs is not None:
+            parent[f"{key}_bs"] = bs
+    return len(targets) - skipped, skipped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Add BS date companion fields to a JSON asset")
+    parser.add_argument("input", type=Path, help="JSON file to annotate")
+    parser.add_argument("paths", nargs="+", help="Field paths, e.g. posts[].timestamp")
+    parser.add_argument("-o", "--output", type=Path, help="Output file (default: rewrite input)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help=f"Processes for inputs over {SHARD_SIZE:,} values")
+    args = parser.parse_args()
+
+    text = args.input.read_text(encoding="utf-8")
+    data = json.loads(text)
+
+    started = time.perf_counter()
+    annotated, skipped = annotate(data, args.paths, args.workers)
+    elapsed = time.perf_counter() - started
+
+    # Keep the file's layout: pretty-printed inputs stay pretty-printed
+    indent = 2 if text[:2] in ("{\n", "[\n") else None
+    output = (args.output or args.input).resolve()
+    tmp = output.with_name(output.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        if text.endswith("\n"):
+            f.write("\n")
+    os.replace(tmp, output)
+
+    print(
+        f"Annotated {annotated:,} fields ({skipped:,} unparseable or out of range) "
+        f"in {elapsed * 1000:.0f} ms → {output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
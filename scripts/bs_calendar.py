@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+BS <-> AD date conversion built on data/bs_calendar_data.json.
+
+Precomputes a cumulative day-offset table (one entry per BS month) anchored at
+meta.reference_ad / meta.reference_bs. Single conversions are a bisect over
+that table; batch conversions of whole arrays use numpy.searchsorted.
+
+Usage as a library (from another script in scripts/):
+    from bs_calendar import BsCalendar
+    cal = BsCalendar.load()
+    cal.ad_to_bs(date(2024, 4, 13))      # BsDate(year=2081, month=1, day=1)
+    cal.bs_to_ad(2081, 1, 1)             # datetime.date(2024, 4, 13)
+
+    from bs_calendar import MonthGrid
+    MonthGrid.load().month(2081, 1)      # MonthInfo(start_weekday=6, length=31, ...)
+
+Usage from the command line:
+    python3 scripts/bs_calendar.py ad 2024-04-13
+    python3 scripts/bs_calendar.py bs 2081-01-01
+    python3 scripts/bs_calendar.py --benchmark 1000000
+"""
+
+import argparse
+import json
+import sys
+import time
+from bisect import bisect_right
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # Only the batch *_array functions need numpy
+    np = None
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "bs_calendar_data.json"
+GRID_FILE = Path(__file__).resolve().parent.parent / "data" / "bs_month_grid.json"
+
+# date.toordinal() of 1970-01-01, to move between ordinals and datetime64[D]
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class BsDate(NamedTuple):
+    year: int
+    month: int
+    day: int
+
+    def __str__(self) -> str:
+        return f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
+
+
+class MonthInfo(NamedTuple):
+    start_weekday: int  # weekday of the 1st, 0 = Sunday ... 6 = Saturday
+    length: int         # days in the month
+    day_offset: int     # days from the 1st of the first table month
+    ad_start: date      # AD date of the 1st
+
+
+class BsCalendar:
+    """Month-length table for a contiguous BS year range with conversion helpers."""
+
+    def __init__(self, data: dict):
+        years = data["years"]
+        self.first_year = min(int(y) for y in years)
+        self.last_year = max(int(y) for y in years)
+
+        # Month lengths in order; index = (year - first_year) * 12 + (month - 1)
+        self.month_lengths: list[int] = []
+        for year in range(self.first_year, self.last_year + 1):
+            self.month_lengths.extend(years[str(year)][1:13])
+
+        # month_starts[i] = days from BS first_year/01/01 to the 1st of month i;
+        # the final entry is the total number of days covered.
+        self.month_starts = [0]
+        for length in self.month_lengths:
+            self.month_starts.append(self.month_starts[-1] + length)
+        self.total_days = self.month_starts[-1]
+
+        # Anchor the table to the Gregorian calendar via the reference pair
+        ref_bs = data["meta"]["reference_bs"]
+        ref_ad = date.fromisoformat(data["meta"]["reference_ad"])
+        ref_offset = self._offset(ref_bs["year"], ref_bs["month"], ref_bs["day"])
+        self.epoch_ordinal = ref_ad.toordinal() - ref_offset
+
+        self._np_month_starts = None
+        self._np_month_lengths = None
+
+    @classmethod
+    def load(cls, path: Path = DATA_FILE) -> "BsCalendar":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    # ------------------------------------------------------------------
+    # Single conversions
+    # ------------------------------------------------------------------
+
+    def month_length(self, year: int, month: int) -> int:
+        return self.month_lengths[self._month_index(year, month)]
+
+    def _month_index(self, year: int, month: int) -> int:
+        if not (self.first_year <= year <= self.last_year):
+            raise ValueError(f"BS year {year} outside {self.first_year}–{self.last_year}")
+        if not 1 <= month <= 12:
+            raise ValueError(f"BS month {month} outside 1–12")
+        return (year - self.first_year) * 12 + (month - 1)
+
+    def _offset(self, year: int, month: int, day: int) -> int:
+        index = self._month_index(year, month)
+        if not 1 <= day <= self.month_lengths[index]:
+            raise ValueError(
+                f"BS day {day} outside 1–{self.month_lengths[index]} for {year}/{month}"
+            )
+        return self.month_starts[index] + day - 1
+
+    def bs_to_ordinal(self, year: int, month: int, day: int) -> int:
+        """Proleptic Gregorian ordinal (date.toordinal()) of a BS date."""
+        return self.epoch_ordinal + self._offset(year, month, day)
+
+    def ordinal_to_bs(self, ordinal: int) -> BsDate:
+        offset = ordinal - self.epoch_ordinal
+        if not 0 <= offset < self.total_days:
+            # Ordinals beyond date's range cannot be shown as dates
+            shown = date.fromordinal(ordinal) if 1 <= ordinal <= date.max.toordinal() else f"ordinal {ordinal}"
+            raise ValueError(f"AD date {shown} outside the BS table range")
+        index = bisect_right(self.month_starts, offset) - 1
+        return BsDate(
+            self.first_year + index // 12,
+            index % 12 + 1,
+            offset - self.month_starts[index] + 1,
+        )
+
+    def bs_to_ad(self, year: int, month: int, day: int) -> date:
+        return date.fromordinal(self.bs_to_ordinal(year, month, day))
+
+    def ad_to_bs(self, ad: date) -> BsDate:
+        return self.ordinal_to_bs(ad.toordinal())
+
+    def weekday(self, year: int, month: int, day: int) -> int:
+        """Weekday of a BS date, 0 = Sunday ... 6 = Saturday."""
+        return self.bs_to_ordinal(year, month, day) % 7
+
+    def month_grid(self) -> dict:
+        """Column-oriented per-month table for data/bs_month_grid.json.
+
+        Row i is BS month (first_year + i // 12, i % 12 + 1). AD starts are
+        encoded as YYYYMMDD integers so every platform can decode them
+        without date arithmetic.
+        """
+        start_weekday, ad_start = [], []
+        for offset in self.month_starts[:-1]:
+            ordinal = self.epoch_ordinal + offset
+            ad = date.fromordinal(ordinal)
+            start_weekday.append(ordinal % 7)
+            ad_start.append(ad.year * 10000 + ad.month * 100 + ad.day)
+
+        return {
+            "first_year": self.first_year,
+            "last_year": self.last_year,
+            "start_weekday": start_weekday,
+            "month_length": self.month_lengths,
+            "day_offset": self.month_starts[:-1],
+            "ad_start": ad_start,
+        }
+
+    # ------------------------------------------------------------------
+    # Batch conversions (numpy)
+    # ------------------------------------------------------------------
+
+    def _tables(self):
+        if np is None:
+            raise RuntimeError("numpy is required for batch conversion: pip install numpy")
+        if self._np_month_starts is None:
+            self._np_month_starts = np.asarray(self.month_starts, dtype=np.int64)
+            self._np_month_lengths = np.asarray(self.month_lengths, dtype=np.int64)
+        return self._np_month_starts, self._np_month_lengths
+
+    def bs_to_ordinal_array(self, years, months, days):
+        """Vectorized bs_to_ordinal over equal-length integer arrays."""
+        starts, lengths = self._tables()
+        years = np.asarray(years, dtype=np.int64)
+        months = np.asarray(months, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+
+        index = (years - self.first_year) * 12 + (months - 1)
+        valid = (
+            (years >= self.first_year) & (years <= self.last_year)
+            & (months >= 1) & (months <= 12)
+        )
+        if not valid.all():
+            bad = np.flatnonzero(~valid)[0]
+            raise ValueError(f"BS date {years[bad]}/{months[bad]} outside the table range")
+        if ((days < 1) | (days > lengths[index])).any():
+            bad = np.flatnonzero((days < 1) | (days > lengths[index]))[0]
+            raise ValueError(f"BS day {days[bad]} invalid for {years[bad]}/{months[bad]}")
+
+        return self.epoch_ordinal + starts[index] + days - 1
+
+    def ordinal_to_bs_array(self, ordinals):
+        """Vectorized ordinal_to_bs; returns (years, months, days) int64 arrays."""
+        starts, _ = self._tables()
+        offsets = np.asarray(ordinals, dtype=np.int64) - self.epoch_ordinal
+        if ((offsets < 0) | (offsets >= self.total_days)).any():
+            raise ValueError("AD dates outside the BS table range")
+
+        index = np.searchsorted(starts, offsets, side="right") - 1
+        return (
+            self.first_year + index // 12,
+            index % 12 + 1,
+            offsets - starts[index] + 1,
+        )
+
+    def bs_to_ad_array(self, years, months, days):
+        """Vectorized bs_to_ad; returns a datetime64[D] array."""
+        ordinals = self.bs_to_ordinal_array(years, months, days)
+        return (ordinals - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+
+    def ad_to_bs_array(self, dates):
+        """Vectorized ad_to_bs over datetime64 values or integer ordinals."""
+        self._tables()
+        dates = np.asarray(dates)
+        if dates.dtype.kind == "M":
+            ordinals = dates.astype("datetime64[D]").astype(np.int64) + UNIX_EPOCH_ORDINAL
+        else:
+            ordinals = dates.astype(np.int64)
+        return self.ordinal_to_bs_array(ordinals)
+
+
+class MonthGrid:
+    """Constant-time reader for data/bs_month_grid.json."""
+
+    def __init__(self, grid: dict):
+        self.first_year = grid["first_year"]
+        self.last_year = grid["last_year"]
+        self.start_weekday = grid["start_weekday"]
+        self.month_length = grid["month_length"]
+        self.day_offset = grid["day_offset"]
+        self.ad_start = grid["ad_start"]
+
+    @classmethod
+    def load(cls, path: Path = GRID_FILE) -> "MonthGrid":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def month(self, year: int, month: int) -> MonthInfo:
+        if not (self.first_year <= year <= self.last_year) or not 1 <= month <= 12:
+            raise ValueError(f"BS month {year}/{month} outside the table range")
+        i = (year - self.first_year) * 12 + (month - 1)
+        ymd = self.ad_start[i]
+        return MonthInfo(
+            self.start_weekday[i],
+            self.month_length[i],
+            self.day_offset[i],
+            date(ymd // 10000, ymd // 100 % 100, ymd % 100),
+        )
+
+
+def benchmark(cal: BsCalendar, count: int) -> None:
+    """Time scalar and batch conversions over random dates in the table range."""
+    import random
+
+    rng = random.Random(0)
+    lo = cal.epoch_ordinal
+    hi = cal.epoch_ordinal + cal.total_days - 1
+    sample = [rng.randint(lo, hi) for _ in range(min(count, 200_000))]
+
+    start = time.perf_counter()
+    bs_dates = [cal.ordinal_to_bs(o) for o in sample]
+    elapsed = time.perf_counter() - start
+    print(f"scalar AD→BS: {len(sample) / elapsed:,.0f} conversions/s", file=sys.stderr)
+
+    start = time.perf_counter()
+    for d in bs_dates:
+        cal.bs_to_ordinal(*d)
+    elapsed = time.perf_counter() - start
+    print(f"scalar BS→AD: {len(sample) / elapsed:,.0f} conversions/s", file=sys.stderr)
+
+    if np is None:
+        print("numpy not installed; skipping batch benchmark", file=sys.stderr)
+        return
+
+    ordinals = np.random.default_rng(0).integers(lo, hi + 1, size=count)
+    start = time.perf_counter()
+    years, months, days = cal.ordinal_to_bs_array(ordinals)
+    elapsed = time.perf_counter() - start
+    print(f"batch AD→BS:  {count / elapsed:,.0f} conversions/s ({count:,} dates)", file=sys.stderr)
+
+    start = time.perf_counter()
+    back = cal.bs_to_ordinal_array(years, months, days)
+    elapsed = time.perf_counter() - start
+    print(f"batch BS→AD:  {count / elapsed:,.0f} conversions/s ({count:,} dates)", file=sys.stderr)
+
+    assert (back == ordinals).all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert dates between BS and AD")
+    parser.add_argument("calendar", nargs="?", choices=["ad", "bs"], help="Calendar of the input date")
+    parser.add_argument("date", nargs="?", help="Date as YYYY-MM-DD")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark N random conversions")
+    args = parser.parse_args()
+
+    cal = BsCalendar.load()
+
+    if args.benchmark:
+        benchmark(cal, args.benchmark)
+        return
+
+    if not (args.calendar and args.date):
+        parser.error("a calendar (ad|bs) and a date are required")
+
+    year, month, day = (int(p) for p in args.date.split("-"))
+    if args.calendar == "ad":
+        print(cal.ad_to_bs(date(year, month, day)))
+    else:
+        print(cal.bs_to_ad(year, month, day).isoformat())
+
+
+if __name__ == "__main__":
+    main()
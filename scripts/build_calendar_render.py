@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Pre-merge calendar data into ready-to-render per-month records.
+
+Joins data/bs_calendar_data.json, nepali_calendar_events.json and
+nepali_calendar_auspicious.json so a month view needs no BS→AD conversion or
+event/auspicious merging at runtime. Output (data/calendar_render.json):
+
+    {
+      "columns": ["day", "ad", "weekday", "holiday", "events", "auspicious"],
+      "events": [["Purnima Brat", "पूर्णिमा व्रत"], ...],   # interned, see encode_calendar_events.py
+      "auspicious": ["bibaha_lagan", "bratabandha", "pasni"],
+      "months": {
+        "2082-01": {
+          "start_weekday": 1, "length": 31, "ad_start": 20250414,
+          "days": [[1, 20250414, 1, 1, [12, 40], [0]], ...]    # one row per day of the month
+        }
+      }
+    }
+
+ad is YYYYMMDD, weekday is 0 = Sunday, holiday is 0/1, events are indexes
+into the event table and auspicious are indexes into the category list.
+
+Usage:
+    python3 scripts/build_calendar_render.py
+"""
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+from bs_calendar import BsCalendar
+from calendar_bitsets import AUSPICIOUS_CATEGORIES
+from encode_calendar_events import encode
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "nepali_calendar_events.json"
+AUSPICIOUS_FILE = DATA_DIR / "nepali_calendar_auspicious.json"
+RENDER_FILE = DATA_DIR / "calendar_render.json"
+
+COLUMNS = ["day", "ad", "weekday", "holiday", "events", "auspicious"]
+
+
+def build_render_records(events: dict, auspicious: dict, calendar: BsCalendar) -> dict:
+    encoded = encode(events)
+    keys = sorted(set(events) | set(auspicious))
+    months = {}
+
+    for key in keys:
+        year, month = (int(p) for p in key.split("-"))
+        length = calendar.month_length(year, month)
+        first = calendar.bs_to_ordinal(year, month, 1)
+
+        day_events = {day: (holiday, ids) for day, holiday, ids in encoded["months"].get(key, [])}
+        day_auspicious: dict[int, list[int]] = {}
+        for i, category in enumerate(AUSPICIOUS_CATEGORIES):
+            for day in auspicious.get(key, {}).get(category, []):
+                day_auspicious.setdefault(day, []).append(i)
+
+        rows = []
+        for day in range(1, length + 1):
+            ordinal = first + day - 1
+            ad = date.fromordinal(ordinal)
+            holiday, ids = day_events.get(day, (0, []))
+            rows.append([
+                day,
+                ad.year * 10000 + ad.month * 100 + ad.day,
+                ordinal % 7,
+                holiday,
+                ids,
+                day_auspicious.get(day, []),
+            ])
+
+        invalid = sorted(set(day_events) | set(day_auspicious))
+        invalid = [d for d in invalid if not 1 <= d <= length]
+        if invalid:
+            print(f"WARNING: {key} has data for days {invalid} outside 1–{length}", file=sys.stderr)
+
+        months[key] = {
+            "start_weekday": rows[0][2],
+            "length": length,
+            "ad_start": rows[0][1],
+            "days": rows,
+        }
+
+    return {
+        "columns": COLUMNS,
+        "events": encoded["events"],
+        "auspicious": AUSPICIOUS_CATEGORIES,
+        "months": months,
+    }
+
+
+def main() -> None:
+    calendar = BsCalendar.load()
+    with open(EVENTS_FILE, "r", encoding="utf-8") as f:
+        events = json.load(f)
+    with open(AUSPICIOUS_FILE, "r", encoding="utf-8") as f:
+        auspicious = json.load(f)
+
+    records = build_render_records(events, auspicious, calendar)
+
+    with open(RENDER_FILE, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, separators=(",", ":"))
+
+    print(
+        f"Written {len(records['months'])} months ({RENDER_FILE.stat().st_size:,} bytes) to {RENDER_FILE}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Bitsets of holidays and auspicious days, one bit per BS day per category.
+
+Categories are "holiday" (from is_holiday in nepali_calendar_events.json)
+and "bibaha_lagan", "bratabandha", "pasni" (from
+nepali_calendar_auspicious.json). Bit i is the i-th day after BS
+<first_year>/01/01 of the covered range. Each bitset is a Python int, so
+unions, intersections, range counts and next-set-bit queries run as
+machine-word operations over the whole range at once.
+
+Usage:
+    python3 scripts/calendar_bitsets.py                     # Build data/calendar_bitsets.json
+    python3 scripts/calendar_bitsets.py --wedding 2082      # Wedding days that are not holidays
+
+    from calendar_bitsets import DayBitsets
+    bits = DayBitsets.load()
+    weddings = bits["bibaha_lagan"] & ~bits["holiday"]
+    bits.count(weddings, BsDate(2082, 1, 1), BsDate(2082, 12, 30))
+    bits.next_set(weddings, BsDate(2082, 7, 1))
+"""
+
+import argparse
+import base64
+import json
+import sys
+from pathlib import Path
+
+from bs_calendar import BsCalendar, BsDate
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "nepali_calendar_events.json"
+AUSPICIOUS_FILE = DATA_DIR / "nepali_calendar_auspicious.json"
+BITSETS_FILE = DATA_DIR / "calendar_bitsets.json"
+
+AUSPICIOUS_CATEGORIES = ["bibaha_lagan", "bratabandha", "pasni"]
+CATEGORIES = ["holiday"] + AUSPICIOUS_CATEGORIES
+
+
+class DayBitsets:
+    def __init__(self, first_year: int, last_year: int, bitsets: dict[str, int], calendar: BsCalendar):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.bitsets = bitsets
+        self.calendar = calendar
+        self.base = calendar.bs_to_ordinal(first_year, 1, 1)
+        self.size = calendar.bs_to_ordinal(last_year, 12, calendar.month_length(last_year, 12)) - self.base + 1
+
+    def __getitem__(self, category: str) -> int:
+        return self.bitsets[category]
+
+    @classmethod
+    def build(cls, events: dict, auspicious: dict, calendar: BsCalendar) -> "DayBitsets":
+        years = [int(k.split("-")[0]) for k in list(events) + list(auspicious)]
+        first_year, last_year = min(years), max(years)
+        base = calendar.bs_to_ordinal(first_year, 1, 1)
+        bitsets = dict.fromkeys(CATEGORIES, 0)
+
+        def bit(year: int, month: int, day: int) -> int | None:
+            if not 1 <= day <= calendar.month_length(year, month):
+                print(f"WARNING: Skipping invalid day {year}/{month}/{day}", file=sys.stderr)
+                return None
+            return calendar.bs_to_ordinal(year, month, day) - base
+
+        for month_data in events.values():
+            for day in month_data.get("days", []):
+                if day.get("is_holiday"):
+                    i = bit(month_data["year"], month_data["month"], day["day"])
+                    if i is not None:
+                        bitsets["holiday"] |= 1 << i
+
+        for month_data in auspicious.values():
+            for category in AUSPICIOUS_CATEGORIES:
+                for day in month_data.get(category, []):
+                    i = bit(month_data["year"], month_data["month"], day)
+                    if i is not None:
+                        bitsets[category] |= 1 << i
+
+        return cls(first_year, last_year, bitsets, calendar)
+
+    @classmethod
+    def load(cls, path: Path = BITSETS_FILE, calendar: BsCalendar | None = None) -> "DayBitsets":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        bitsets = {
+            name: int.from_bytes(base64.b64decode(encoded), "little")
+            for name, encoded in data["bitsets"].items()
+        }
+        return cls(data["first_year"], data["last_year"], bitsets, calendar or BsCalendar.load())
+
+    def save(self, path: Path = BITSETS_FILE) -> None:
+        nbytes = (self.size + 7) // 8
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "first_year": self.first_year,
+                "last_year": self.last_year,
+                "days": self.size,
+                "bit_order": "little",
+                "bitsets": {
+                    name: base64.b64encode(bits.to_bytes(nbytes, "little")).decode("ascii")
+                    for name, bits in self.bitsets.items()
+                },
+            }, f, indent=2)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _bit(self, date: BsDate) -> int:
+        return self.calendar.bs_to_ordinal(*date) - self.base
+
+    def _date(self, bit: int) -> BsDate:
+        return self.calendar.ordinal_to_bs(self.base + bit)
+
+    def range_mask(self, start: BsDate, end: BsDate) -> int:
+        """Bits set for every day in [start, end], clipped to the covered range."""
+        lo = max(self._bit(start), 0)
+        hi = min(self._bit(end), self.size - 1)
+        if hi < lo:
+            return 0
+        return ((1 << (hi - lo + 1)) - 1) << lo
+
+    def count(self, bits: int, start: BsDate, end: BsDate) -> int:
+        return (bits & self.range_mask(start, end)).bit_count()
+
+    def next_set(self, bits: int, after: BsDate) -> BsDate | None:
+        """First set day on or after `after`."""
+        pos = max(self._bit(after), 0)
+        rest = bits >> pos
+        if not rest:
+            return None
+        return self._date(pos + (rest & -rest).bit_length() - 1)
+
+    def days(self, bits: int, start: BsDate, end: BsDate) -> list[BsDate]:
+        """All set days in [start, end]."""
+        bits &= self.range_mask(start, end)
+        result = []
+        while bits:
+            low = bits & -bits
+            result.append(self._date(low.bit_length() - 1))
+            bits ^= low
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query calendar day bitsets")
+    parser.add_argument("--wedding", type=int, metavar="YEAR", help="List bibaha lagan days that are not holidays")
+    args = parser.parse_args()
+
+    calendar = BsCalendar.load()
+
+    if args.wedding:
+        bits = DayBitsets.load(calendar=calendar)
+        weddings = bits["bibaha_lagan"] & ~bits["holiday"]
+        start = BsDate(args.wedding, 1, 1)
+        end = BsDate(args.wedding, 12, calendar.month_length(args.wedding, 12))
+        days = bits.days(weddings, start, end)
+        print(f"{len(days)} wedding days in {args.wedding} that are not holidays:")
+        for day in days:
+            print(f"  {day}  {calendar.bs_to_ad(*day).isoformat()}")
+        return
+
+    with open(EVENTS_FILE, "r", encoding="utf-8") as f:
+        events = json.load(f)
+    with open(AUSPICIOUS_FILE, "r", encoding="utf-8") as f:
+        auspicious = json.load(f)
+
+    bits = DayBitsets.build(events, auspicious, calendar)
+    bits.save()
+
+    for name in CATEGORIES:
+        print(f"{name}: {bits[name].bit_count():,} days", file=sys.stderr)
+    print(f"Written {bits.size:,} days × {len(CATEGORIES)} categories to {BITSETS_FILE}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Inverted index from normalized event name to the days it falls on.
+
+Every event in data/nepali_calendar_events.json is indexed under its full
+normalized English and Nepali names and under each word of those names, so
+"Ekadashi" finds "Kamada Ekadashibratam" by prefix. Postings are sorted
+arrays of day ordinals (date.toordinal() of the AD date), so next-occurrence
+and range queries are binary searches and prefix search is a bisect over the
+sorted key list.
+
+Usage:
+    python3 scripts/calendar_event_index.py                         # Build data/calendar_event_index.json
+    python3 scripts/calendar_event_index.py --next "Ghatasthapana"
+    python3 scripts/calendar_event_index.py --next ekadashi --prefix
+    python3 scripts/calendar_event_index.py --range "Loktantra Diwas" 2070-01-01 2080-12-30
+    python3 scripts/calendar_event_index.py --check                 # Index vs brute-force scan, incl. Nepali
+"""
+
+import argparse
+import heapq
+import json
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bs_calendar import BsCalendar, BsDate
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "nepali_calendar_events.json"
+INDEX_FILE = DATA_DIR / "calendar_event_index.json"
+NEPAL_TZ = timezone(timedelta(hours=5, minutes=45))
+
+# Parenthetical notes like "(Holiday for Ktm Only)" are not part of the name
+PAREN_PATTERN = re.compile(r"\([^)]*\)")
+
+# (query, prefix) pairs --check compares against a brute-force scan
+CHECK_QUERIES = [
+    ("दशैं", False),
+    ("तिह", True),
+    ("विश्वकर्मा पूजा", False),
+    ("Ghatasthapana", False),
+    ("ekadashi", True),
+]
+
+
+def normalize(name: str) -> str:
+    """Case-fold, drop punctuation and parenthetical notes, collapse spaces."""
+    name = unicodedata.normalize("NFC", name)
+    name = PAREN_PATTERN.sub(" ", name).casefold()
+    # Keep letters, combining marks (Devanagari vowel signs, virama) and digits;
+    # \w would split "दशैं" into "दश" and drop the anusvara
+    name = "".join(c if unicodedata.category(c)[0] in "LMN" else " " for c in name)
+    return " ".join(name.split())
+
+
+def index_keys(name: str) -> set[str]:
+    """The full normalized name plus each of its words."""
+    full = normalize(name)
+    if not full:
+        return set()
+    return {full, *full.split()}
+
+
+class EventIndex:
+    def __init__(self, postings: dict[str, list[int]], calendar: BsCalendar):
+        self.keys = sorted(postings)
+        self.postings = postings
+        self.calendar = calendar
+        self._merged: dict[str, list[int]] = {}
+
+    @classmethod
+    def build(cls, events: dict, calendar: BsCalendar) -> "EventIndex":
+        postings: dict[str, set[int]] = {}
+        for month_data in events.values():
+            year, month = month_data["year"], month_data["month"]
+            for day in month_data.get("days", []):
+                ordinal = calendar.bs_to_ordinal(year, month, day["day"])
+                for name in day.get("events", []) + day.get("events_np", []):
+                    for key in index_keys(name):
+                        postings.setdefault(key, set()).add(ordinal)
+        return cls({k: sorted(v) for k, v in postings.items()}, calendar)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_FILE, calendar: BsCalendar | None = None) -> "EventIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(dict(zip(data["keys"], data["postings"])), calendar or BsCalendar.load())
+
+    def save(self, path: Path = INDEX_FILE) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"keys": self.keys, "postings": [self.postings[k] for k in self.keys]},
+                f, ensure_ascii=False, separators=(",", ":"),
+            )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def prefix_search(self, prefix: str) -> list[str]:
+        """All index keys starting with the normalized prefix."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        return self.keys[start:end]
+
+    def _days(self, name: str, prefix: bool) -> list[int]:
+        if not prefix:
+            return self.postings.get(normalize(name), [])
+        key = normalize(name)
+        if key not in self._merged:
+            merged: list[int] = []
+            for ordinal in heapq.merge(*(self.postings[k] for k in self.prefix_search(key))):
+                if not merged or merged[-1] != ordinal:
+                    merged.append(ordinal)
+            self._merged[key] = merged
+        return self._merged[key]
+
+    def occurrences(self, name: str, start: BsDate | None = None, end: BsDate | None = None,
+                    prefix: bool = False) -> list[BsDate]:
+        """All days in [start, end] (inclusive) on which the event falls."""
+        days = self._days(name, prefix)
+        lo = bisect_left(days, self.calendar.bs_to_ordinal(*start)) if start else 0
+        hi = bisect_right(days, self.calendar.bs_to_ordinal(*end)) if end else len(days)
+        return [self.calendar.ordinal_to_bs(o) for o in days[lo:hi]]
+
+    def next_occurrence(self, name: str, after: BsDate | None = None,
+                        prefix: bool = False) -> BsDate | None:
+        """First day on or after `after` (default: today in Nepal)."""
+        days = self._days(name, prefix)
+        if after is None:
+            ordinal = datetime.now(tz=NEPAL_TZ).date().toordinal()
+        else:
+            ordinal = self.calendar.bs_to_ordinal(*after)
+        i = bisect_left(days, ordinal)
+        return self.calendar.ordinal_to_bs(days[i]) if i < len(days) else None
+
+
+def check(events: dict, index: EventIndex) -> list[str]:
+    """Compare index lookups with a scan over every event name; returns mismatches."""
+    errors = []
+    for name in ("विश्वकर्मा पूजा", "दशैं", "तिहार"):
+        if normalize(name) != name:
+            errors.append(f"normalize mangles Devanagari: {name!r} -> {normalize(name)!r}")
+
+    for query, prefix in CHECK_QUERIES:
+        wanted = normalize(query)
+        expected = set()
+        for month_data in events.values():
+            for day in month_data.get("days", []):
+                for name in day.get("events", []) + day.get("events_np", []):
+                    keys = index_keys(name)
+                    if any(k.startswith(wanted) for k in keys) if prefix else wanted in keys:
+                        expected.add(index.calendar.bs_to_ordinal(month_data["year"], month_data["month"], day["day"]))
+        found = index.occurrences(query, prefix=prefix)
+        if not expected:
+            errors.append(f"{query!r}: no event in the data matches; pick another check query")
+        elif [index.calendar.bs_to_ordinal(*bs) for bs in found] != sorted(expected):
+            errors.append(f"{query!r} (prefix={prefix}): index found {len(found)} days, scan {len(expected)}")
+        else:
+            print(f"{query!r}{' (prefix)' if prefix else ''}: {len(found)} days, e.g. {found[0]}", file=sys.stderr)
+    return errors
+
+
+def parse_bs(text: str) -> BsDate:
+    year, month, day = (int(p) for p in text.split("-"))
+    return BsDate(year, month, day)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and query the calendar event index")
+    parser.add_argument("--next", metavar="NAME", help="Next occurrence of an event from today")
+    parser.add_argument("--range", nargs=3, metavar=("NAME", "START", "END"), help="Occurrences between two BS dates")
+    parser.add_argument("--search", metavar="PREFIX", help="List index keys starting with PREFIX")
+    parser.add_argument("--prefix", action="store_true", help="Treat NAME as a prefix for --next/--range")
+    parser.add_argument("--check", action="store_true", help="Verify lookups against a brute-force scan")
+    args = parser.parse_args()
+
+    calendar = BsCalendar.load()
+
+    if args.check:
+        with open(EVENTS_FILE, "r", encoding="utf-8") as f:
+            events = json.load(f)
+        errors = check(events, EventIndex.build(events, calendar))
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        if errors:
+            sys.exit(1)
+        print("Index check passed.", file=sys.stderr)
+        return
+
+    if not (args.next or args.range or args.search):
+        with open(EVENTS_FILE, "r", encoding="utf-8") as f:
+            events = json.load(f)
+        index = EventIndex.build(events, calendar)
+        index.save()
+        total = sum(len(p) for p in index.postings.values())
+        print(f"Indexed {len(index.keys):,} keys ({total:,} postings) to {INDEX_FILE}", file=sys.stderr)
+        return
+
+    index = EventIndex.load(calendar=calendar)
+
+    if args.search:
+        for key in index.prefix_search(args.search):
+            print(f"{key}\t{len(index.postings[key])}")
+    if args.next:
+        bs = index.next_occurrence(args.next, prefix=args.prefix)
+        print(f"{bs}\t{calendar.bs_to_ad(*bs).isoformat()}" if bs else "No upcoming occurrence")
+    if args.range:
+        name, start, end = args.range
+        for bs in index.occurrences(name, parse_bs(start), parse_bs(end), prefix=args.prefix):
+            print(f"{bs}\t{calendar.bs_to_ad(*bs).isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
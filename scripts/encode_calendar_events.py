@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Dictionary-encode data/nepali_calendar_events.json.
+
+Event names such as "Purnimabratam" or "Aunshi" and their events_np
+translations repeat thousands of times. The encoded format interns every
+distinct (English, Nepali) pair once, most frequent first, and stores each
+day as [day, is_holiday, [event ids]]:
+
+    {
+      "format": "interned-events/1",
+      "events": [["Purnimabratam", "पूर्णिमा व्रत"], ...],
+      "months": {"2068-01": [[1, 1, [12, 40]], [4, 0, [0]], ...], ...}
+    }
+
+decode() restores the original structure exactly.
+
+Usage:
+    python3 scripts/encode_calendar_events.py            # Write data/nepali_calendar_events.encoded.json
+    python3 scripts/encode_calendar_events.py --stats    # Also report size and parse-time reduction
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "nepali_calendar_events.json"
+ENCODED_FILE = DATA_DIR / "nepali_calendar_events.encoded.json"
+
+FORMAT = "interned-events/1"
+
+
+def encode(data: dict) -> dict:
+    """Intern (event, event_np) pairs and replace them with integer IDs."""
+    pairs = Counter()
+    for month_data in data.values():
+        for day in month_data.get("days", []):
+            pairs.update(zip(day["events"], day["events_np"]))
+
+    # Most frequent pairs get the smallest (shortest to serialize) IDs
+    table = [pair for pair, _ in pairs.most_common()]
+    ids = {pair: i for i, pair in enumerate(table)}
+
+    months = {}
+    for key, month_data in data.items():
+        months[key] = [
+            [
+                day["day"],
+                1 if day["is_holiday"] else 0,
+                [ids[pair] for pair in zip(day["events"], day["events_np"])],
+            ]
+            for day in month_data.get("days", [])
+        ]
+
+    return {
+        "format": FORMAT,
+        "events": [list(pair) for pair in table],
+        "months": months,
+    }
+
+
+def decode_month(encoded: dict, key: str) -> dict:
+    """Rebuild one "YYYY-MM" month record from the encoded form."""
+    table = encoded["events"]
+    year, month = (int(p) for p in key.split("-"))
+    days = []
+    for day, holiday, event_ids in encoded["months"][key]:
+        days.append({
+            "day": day,
+            "events": [table[i][0] for i in event_ids],
+            "is_holiday": bool(holiday),
+            "events_np": [table[i][1] for i in event_ids],
+        })
+    return {"year": year, "month": month, "days": days}
+
+
+def decode(encoded: dict) -> dict:
+    """Rebuild the full nepali_calendar_events.json structure."""
+    if encoded.get("format") != FORMAT:
+        raise ValueError(f"Unsupported events format: {encoded.get('format')!r}")
+    return {key: decode_month(encoded, key) for key in encoded["months"]}
+
+
+def _best_time(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report_stats(original_text: str, encoded_text: str) -> None:
+    original_size = len(original_text.encode("utf-8"))
+    encoded_size = len(encoded_text.encode("utf-8"))
+
+    parse_original = _best_time(lambda: json.loads(original_text))
+    parse_encoded = _best_time(lambda: json.loads(encoded_text))
+    encoded = json.loads(encoded_text)
+    parse_decode = _best_time(lambda: decode(json.loads(encoded_text)))
+
+    print(f"Size:  {original_size:>9,} bytes → {encoded_size:,} bytes "
+          f"({100 * (1 - encoded_size / original_size):.1f}% smaller)", file=sys.stderr)
+    print(f"Parse: {parse_original * 1000:>8.2f} ms → {parse_encoded * 1000:.2f} ms "
+          f"({parse_original / parse_encoded:.1f}x faster)", file=sys.stderr)
+    print(f"Parse + full decode: {parse_decode * 1000:.2f} ms", file=sys.stderr)
+    print(f"Interned {len(encoded['events']):,} distinct events", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dictionary-encode calendar events")
+    parser.add_argument("-i", "--input", type=Path, default=EVENTS_FILE, help="Events JSON to encode")
+    parser.add_argument("-o", "--output", type=Path, default=ENCODED_FILE, help="Encoded output path")
+    parser.add_argument("--stats", action="store_true", help="Report size and parse-time reduction")
+    args = parser.parse_args()
+
+    original_text = args.input.read_text(encoding="utf-8")
+    data = json.loads(original_text)
+
+    encoded = encode(data)
+    assert decode(encoded) == data, "encoded events do not round-trip"
+
+    encoded_text = json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+    args.output.write_text(encoded_text, encoding="utf-8")
+    print(f"Written to: {args.output}", file=sys.stderr)
+
+    if args.stats:
+        report_stats(original_text, encoded_text)
+
+
+if __name__ == "__main__":
+    main()
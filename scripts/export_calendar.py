@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Export the Nepali event/holiday calendar as RFC 5545 ICS or CSV.
+
+Events are streamed through a generator pipeline (months → day records →
+output lines) and written incrementally, with AD dates computed from
+data/bs_calendar_data.json. When the per-year shards from
+shard_calendar_events.py exist (and were written from the current events
+JSON) only one year is held in memory at a time; otherwise the single
+events JSON is read.
+
+The source marks whole days as holidays, not events, so exactly one event
+per holiday is exported as the holiday: the one whose text names it
+("Indrajatra (Holiday in Kathmandu Valley Only)"), otherwise the day's
+first event, which is the one the day is known for ("New Year 2082
+starts"). The other events of the day stay ordinary events.
+
+Event UIDs are the BS date plus a hash of the event name, so they survive
+events being added, dropped or reordered in the source data.
+
+Usage:
+    python3 scripts/export_calendar.py -f ics -o nepali_calendar.ics      # every year in the table
+    python3 scripts/export_calendar.py -f csv --start 2082 --end 2082 --holidays-only
+    python3 scripts/export_calendar.py --check                           # Holiday and UID checks
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, NamedTuple, TextIO
+
+from bs_calendar import BsCalendar, BsDate
+from shard_calendar_events import EVENTS_FILE, SHARD_DIR, EventShards
+
+PRODID = "-//Nagarik Patro//Nepali Calendar//EN"
+UID_DOMAIN = "nagarikpatro.app"
+NOTE = re.compile(r"\([^)]*\)")
+
+
+class DayEvent(NamedTuple):
+    bs: BsDate
+    ad: date
+    name: str
+    name_np: str
+    is_holiday: bool
+    uid: str
+
+
+def open_shards() -> EventShards | None:
+    """The per-year shards, unless missing or written from an older events JSON."""
+    if not (SHARD_DIR / "index.json").exists():
+        return None
+    shards = EventShards(SHARD_DIR)
+    if not shards.is_current(EVENTS_FILE):
+        print(
+            f"Warning: {SHARD_DIR} is out of date with {EVENTS_FILE.name}; reading it directly "
+            "(re-run shard_calendar_events.py)",
+            file=sys.stderr,
+        )
+        return None
+    return shards
+
+
+def iter_months(shards: EventShards | None, start_year: int | None = None, end_year: int | None = None) -> Iterator[dict]:
+    """Yield month records in order, one shard year at a time when available."""
+    def wanted(year: int) -> bool:
+        return (start_year is None or year >= start_year) and (end_year is None or year <= end_year)
+
+    if shards is not None:
+        for year in filter(wanted, shards.years()):
+            months = shards.year(year, cache=False)
+            for key in sorted(months):
+                yield months[key]
+        return
+
+    with open(EVENTS_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for key in sorted(data):
+        if wanted(data[key]["year"]):
+            yield data[key]
+
+
+def event_key(name: str) -> str:
+    """An event name without parenthesised notes, case and spacing."""
+    return " ".join(NOTE.sub(" ", name).split()).casefold()
+
+
+def holiday_index(names: list[str]) -> int:
+    """Position of the event a holiday is for: the one naming the holiday, else the first."""
+    for i, name in enumerate(names):
+        if "holiday" in name.lower():
+            # "(Holiday for ...)" is a note the scraper split off the event before it
+            return i - 1 if name.lstrip().startswith("(") and i else i
+    return 0
+
+
+def event_uids(bs: BsDate, names: list[str]) -> list[str]:
+    """Content-derived UIDs; a name repeated within a day gets a counter."""
+    uids, seen = [], {}
+    for name in names:
+        digest = hashlib.sha1(event_key(name).encode("utf-8")).hexdigest()[:12]
+        seen[digest] = seen.get(digest, 0) + 1
+        suffix = f"-{seen[digest]}" if seen[digest] > 1 else ""
+        uids.append(f"{bs}-{digest}{suffix}@{UID_DOMAIN}")
+    return uids
+
+
+def iter_events(months: Iterator[dict], calendar: BsCalendar, holidays_only: bool = False) -> Iterator[DayEvent]:
+    for month_data in months:
+        year, month = month_data["year"], month_data["month"]
+        for day in month_data.get("days", []):
+            if holidays_only and not day.get("is_holiday"):
+                continue
+            bs = BsDate(year, month, day["day"])
+            ad = calendar.bs_to_ad(*bs)
+            names = day.get("events", [])
+            names_np = day.get("events_np", [])
+            holiday = holiday_index(names) if day.get("is_holiday") else -1
+            for i, (name, uid) in enumerate(zip(names, event_uids(bs, names))):
+                if holidays_only and i != holiday:
+                    continue
+                yield DayEvent(bs, ad, name, names_np[i] if i < len(names_np) else "", i == holiday, uid)
+
+
+def ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def ics_fold(line: str) -> Iterator[str]:
+    """Fold a content line at 75 octets without splitting UTF-8 sequences."""
+    encoded = line.encode("utf-8")
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        yield encoded[:cut].decode("utf-8")
+        encoded = b" " + encoded[cut:]
+    yield encoded.decode("utf-8")
+
+
+def ics_lines(events: Iterator[DayEvent], dtstamp: str) -> Iterator[str]:
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    yield "X-WR-CALNAME:Nepali Calendar"
+    for event in events:
+        description = f"{event.name_np}\nBS {event.bs}" if event.name_np else f"BS {event.bs}"
+        yield "BEGIN:VEVENT"
+        yield f"UID:{event.uid}"
+        yield f"DTSTAMP:{dtstamp}"
+        yield f"DTSTART;VALUE=DATE:{event.ad:%Y%m%d}"
+        yield f"DTEND;VALUE=DATE:{event.ad + timedelta(days=1):%Y%m%d}"
+        yield f"SUMMARY:{ics_escape(event.name)}"
+        yield f"DESCRIPTION:{ics_escape(description)}"
+        if event.is_holiday:
+            yield "CATEGORIES:Holiday"
+        yield "TRANSP:TRANSPARENT"
+        yield "END:VEVENT"
+    yield "END:VCALENDAR"
+
+
+def write_ics(events: Iterator[DayEvent], out: TextIO) -> int:
+    dtstamp = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    count = 0
+    for line in ics_lines(events, dtstamp):
+        if line == "BEGIN:VEVENT":
+            count += 1
+        for folded in ics_fold(line):
+            out.write(folded + "\r\n")
+    return count
+
+
+def write_csv(events: Iterator[DayEvent], out: TextIO) -> int:
+    writer = csv.writer(out)
+    writer.writerow(["bs_date", "ad_date", "weekday", "event", "event_np", "is_holiday"])
+    count = 0
+    for event in events:
+        writer.writerow([
+            str(event.bs), event.ad.isoformat(), event.ad.strftime("%A"),
+            event.name, event.name_np, int(event.is_holiday),
+        ])
+        count += 1
+    return count
+
+
+# (BS date, event exported as the holiday, events that must not be)
+CHECK_HOLIDAYS = [
+    (BsDate(2082, 1, 1), "New Year 2082 starts", ["Khayu Shanlhu"]),
+    (BsDate(2068, 1, 1), "New Year", ["Kamada Ekadashibratam"]),
+    (BsDate(2068, 7, 24), "Gurunanak jayanti", ["(Holiday for Nepali Shikha Followers Government Employee only)"]),
+]
+
+
+def check(calendar: BsCalendar) -> list[str]:
+    """Check holiday flags over the whole table and UID stability; returns failures."""
+    errors = []
+    flagged: dict[BsDate, list[str]] = {}
+    uids: set[str] = set()
+    holidays = set()
+    for month_data in iter_months(None):
+        for day in month_data.get("days", []):
+            if day.get("is_holiday"):
+                holidays.add(BsDate(month_data["year"], month_data["month"], day["day"]))
+    for event in iter_events(iter_months(None), calendar):
+        if event.uid in uids:
+            errors.append(f"{event.bs}: duplicate UID {event.uid}")
+        uids.add(event.uid)
+        if event.is_holiday:
+            flagged.setdefault(event.bs, []).append(event.name)
+
+    for bs, names in flagged.items():
+        if len(names) != 1:
+            errors.append(f"{bs}: {len(names)} events flagged as the holiday: {names}")
+    if set(flagged) != holidays:
+        errors.append(f"{len(set(flagged) ^ holidays)} days flagged unlike the source's is_holiday")
+    for bs, holiday, others in CHECK_HOLIDAYS:
+        names = flagged.get(bs, [])
+        if names != [holiday]:
+            errors.append(f"{bs}: expected {holiday!r} as the holiday, got {names}")
+        for name in others:
+            if name in names:
+                errors.append(f"{bs}: {name!r} flagged as a holiday")
+
+    bs = BsDate(2082, 1, 1)
+    names = ["New Year 2082 starts", "Khayu Shanlhu", "Bhaktapur Biswadhojpatan (Biskajatra)"]
+    uid = dict(zip(names, event_uids(bs, names)))
+    for variant in (names[::-1], names[1:], [*names, "Khayu  shanlhu"]):
+        for name, moved in zip(variant, event_uids(bs, variant)):
+            if name in uid and moved != uid[name]:
+                errors.append(f"UID of {name!r} changed from {uid[name]} to {moved} when the day's events changed")
+
+    print(f"{len(flagged):,} holidays flagged once each, {len(uids):,} unique UIDs", file=sys.stderr)
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the Nepali calendar as ICS or CSV")
+    parser.add_argument("-f", "--format", choices=["ics", "csv"], default="ics", help="Output format")
+    parser.add_argument("-o", "--output", help="Output file path (default: stdout)")
+    parser.add_argument("--start", type=int, help="First BS year (default: first year with events)")
+    parser.add_argument("--end", type=int, help="Last BS year (default: last year with events)")
+    parser.add_argument("--holidays-only", action="store_true", help="Only export public holidays")
+    parser.add_argument("--check", action="store_true", help="Verify holiday flags and UIDs over the whole table")
+    args = parser.parse_args()
+
+    calendar = BsCalendar.load()
+
+    if args.check:
+        errors = check(calendar)
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        if errors:
+            sys.exit(1)
+        print("Export check passed.", file=sys.stderr)
+        return
+    start_year = max(args.start, calendar.first_year) if args.start is not None else None
+    end_year = min(args.end, calendar.last_year) if args.end is not None else None
+
+    started = time.perf_counter()
+    shards = open_shards()
+    events = iter_events(iter_months(shards, start_year, end_year), calendar, args.holidays_only)
+    writer = write_ics if args.format == "ics" else write_csv
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            count = writer(events, f)
+    else:
+        sys.stdout.reconfigure(newline="")
+        count = writer(events, sys.stdout)
+
+    elapsed = time.perf_counter() - started
+    print(f"Exported {count:,} events as {args.format.upper()} in {elapsed * 1000:.0f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,62 +3,199 @@
 Extract BS calendar month-length tables from nepali_utils Dart package.
 
 Reads _nepaliYears map from nepali_date_time.dart and outputs structured JSON
-for consumption by native macOS (Swift) and Windows (C#) apps.
+for consumption by native macOS (Swift) and Windows (C#) apps, plus a
+precomputed per-month grid table (bs_month_grid.json) so month rendering is a
+table read instead of a walk from the reference date.
 
-Source: nepali_utils 3.0.8 — pub.dev/packages/nepali_utils
+Year tables are merged from pluggable sources in priority order:
+    dart      _nepaliYears map in the local pub cache (if installed)
+    snapshot  vendored copy of that map (scripts/vendor/nepali_years_snapshot.json)
+    json      the previously generated data/bs_calendar_data.json
+Disagreements between sources are reported year by year. The output's
+meta.source names the sources that actually contributed years, and
+meta.merged_sources counts the years each contributed. The merged table and
+that provenance are hashed, and regeneration is skipped when the hash
+matches the existing output.
+
+Upstream: nepali_utils 3.0.8 — pub.dev/packages/nepali_utils
+
+Usage:
+    python3 scripts/extract_bs_calendar_data.py
+    python3 scripts/extract_bs_calendar_data.py --sources snapshot,json
+    python3 scripts/extract_bs_calendar_data.py --update-snapshot   # Refresh vendored copy from Dart
+    python3 scripts/extract_bs_calendar_data.py --force             # Ignore the hash gate
 """
 
+import argparse
+import hashlib
 import json
 import re
 import sys
+from abc import ABC, abstractmethod
 from pathlib import Path
 
-DART_SOURCE = Path.home() / ".pub-cache/hosted/pub.dev/nepali_utils-3.0.8/lib/src/nepali_date_time.dart"
-OUTPUT = Path(__file__).resolve().parent.parent / "data" / "bs_calendar_data.json"
+from bs_calendar import BsCalendar, GRID_FILE
+from verify_bs_calendar import verify_calendar
 
-# Matches lines like: 1969: [366, 31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31],
-YEAR_PATTERN = re.compile(r"^\s*(\d{4}):\s*\[([^\]]+)\]")
+SCRIPTS_DIR = Path(__file__).resolve().parent
+NEPALI_UTILS_VERSION = "3.0.8"
+DART_SOURCE = (
+    Path.home() / f".pub-cache/hosted/pub.dev/nepali_utils-{NEPALI_UTILS_VERSION}/lib/src/nepali_date_time.dart"
+)
+SNAPSHOT = SCRIPTS_DIR / "vendor" / "nepali_years_snapshot.json"
+OUTPUT = SCRIPTS_DIR.parent / "data" / "bs_calendar_data.json"
 
+# Matches entries like: 1969: [366, 31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31],
+YEAR_PATTERN = re.compile(r"(\d{4})\s*:\s*\[([^\]]+)\]")
+MAP_PATTERN = re.compile(r"_nepaliYears\b[^{]*\{(.*?)\n\s*\};", re.DOTALL)
 
-def parse_nepali_years(dart_path: Path) -> dict[str, list[int]]:
-    if not dart_path.exists():
-        print(f"ERROR: Dart source not found at {dart_path}", file=sys.stderr)
-        print("Install nepali_utils 3.0.8: flutter pub add nepali_utils", file=sys.stderr)
-        sys.exit(1)
+# Generator code that shapes the output; a change here must invalidate the hash gate
+GENERATOR_FILES = [
+    SCRIPTS_DIR / "extract_bs_calendar_data.py",
+    SCRIPTS_DIR / "bs_calendar.py",
+]
+
+
+class YearSource(ABC):
+    """A provider of {year: [total, month1..month12]} tables."""
+
+    name = ""
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Where the loaded table ultimately comes from, set by load()
+        self.provenance = ""
+
+    def available(self) -> bool:
+        return self.path.exists()
+
+    @abstractmethod
+    def load(self) -> dict[str, list[int]]:
+        ...
+
+
+class DartSource(YearSource):
+    name = "dart"
+
+    def load(self) -> dict[str, list[int]]:
+        self.provenance = f"nepali_utils {NEPALI_UTILS_VERSION}"
+        return parse_nepali_years(self.path.read_text())
+
+
+class SnapshotSource(YearSource):
+    name = "snapshot"
+
+    def load(self) -> dict[str, list[int]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.provenance = f"{snapshot.get('source', 'unknown')} (vendored snapshot)"
+        return snapshot["years"]
+
+
+class JsonSource(YearSource):
+    name = "json"
+
+    def load(self) -> dict[str, list[int]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # A regenerated table inherits the provenance of the one it came from
+        self.provenance = data.get("meta", {}).get("source", f"previous {self.path.name}")
+        return data["years"]
+
+
+SOURCES = {
+    "dart": lambda: DartSource(DART_SOURCE),
+    "snapshot": lambda: SnapshotSource(SNAPSHOT),
+    "json": lambda: JsonSource(OUTPUT),
+}
+
+
+def parse_nepali_years(dart_text: str) -> dict[str, list[int]]:
+    """Parse the _nepaliYears map body, independent of line layout."""
+    body = MAP_PATTERN.search(dart_text)
+    if not body:
+        return {}
+
+    years: dict[str, list[int]] = {}
+    for year_str, values_str in YEAR_PATTERN.findall(body.group(1)):
+        values = [int(v) for v in values_str.replace("\n", " ").split(",") if v.strip()]
+        if len(values) != 13:
+            print(
+                f"WARNING: Year {year_str} has {len(values)} values (expected 13)",
+                file=sys.stderr,
+            )
+        years[year_str] = values
+
+    return years
+
+
+def merge_sources(sources: list[YearSource]) -> tuple[dict[str, list[int]], dict[str, str], list[str]]:
+    """Merge year tables; earlier sources win, later disagreements are reported.
 
+    Returns (years, name of the source each year came from, conflict messages).
+    """
     years: dict[str, list[int]] = {}
-    in_map = False
-
-    with open(dart_path, "r") as f:
-        for line in f:
-            stripped = line.strip()
-
-            if "_nepaliYears" in stripped and "{" in stripped:
-                in_map = True
-                continue
-
-            if in_map and stripped == "};":
-                break
-
-            if not in_map:
-                continue
-
-            match = YEAR_PATTERN.match(stripped)
-            if match:
-                year_str = match.group(1)
-                values = [int(v.strip()) for v in match.group(2).split(",")]
-                if len(values) != 13:
-                    print(
-                        f"WARNING: Year {year_str} has {len(values)} values (expected 13)",
-                        file=sys.stderr,
-                    )
+    origin: dict[str, str] = {}
+    conflicts: list[str] = []
+
+    for source in sources:
+        if not source.available():
+            print(f"Source {source.name}: not found at {source.path}", file=sys.stderr)
+            continue
+
+        loaded = source.load()
+        print(f"Source {source.name}: {len(loaded)} years from {source.path}", file=sys.stderr)
+
+        for year_str, values in loaded.items():
+            if year_str not in years:
                 years[year_str] = values
+                origin[year_str] = source.name
+            elif years[year_str] != values:
+                conflicts.append(
+                    f"Year {year_str}: {origin[year_str]}={years[year_str]} "
+                    f"{source.name}={values}"
+                )
 
-    if not years:
-        print("ERROR: No year data found in Dart source", file=sys.stderr)
-        sys.exit(1)
+    years = {k: years[k] for k in sorted(years, key=int)}
+    return years, origin, conflicts
 
-    return years
+
+def provenance(sources: list[YearSource], origin: dict[str, str]) -> dict:
+    """meta.source and meta.merged_sources for the sources that contributed years."""
+    counts = {source.name: 0 for source in sources}
+    for name in origin.values():
+        counts[name] += 1
+    used = [source for source in sources if counts[source.name]]
+
+    labels: list[str] = []
+    for source in used:
+        for label in source.provenance.split("; "):
+            if label and label not in labels:
+                labels.append(label)
+    return {
+        "source": "; ".join(labels),
+        "merged_sources": [{"name": s.name, "path": s.path.name, "years": counts[s.name]} for s in used],
+    }
+
+
+def table_hash(years: dict[str, list[int]], meta: dict) -> str:
+    """Hash of the merged table, its provenance and the generator code that shapes the output."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(years, sort_keys=True, separators=(",", ":")).encode())
+    digest.update(json.dumps(meta, sort_keys=True).encode())
+    for path in GENERATOR_FILES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def existing_hash() -> str | None:
+    if not (OUTPUT.exists() and GRID_FILE.exists()):
+        return None
+    try:
+        with open(OUTPUT, "r", encoding="utf-8") as f:
+            return json.load(f)["meta"].get("input_hash")
+    except (json.JSONDecodeError, KeyError):
+        return None
 
 
 def validate_years(years: dict[str, list[int]]) -> None:
@@ -92,10 +229,11 @@ def validate_years(years: dict[str, list[int]]) -> None:
     print(f"Extracted {len(years)} years: BS {year_keys[0]}–{year_keys[-1]}", file=sys.stderr)
 
 
-def build_output(years: dict[str, list[int]]) -> dict:
+def build_output(years: dict[str, list[int]], sources_meta: dict, input_hash: str) -> dict:
     return {
         "meta": {
-            "source": "nepali_utils 3.0.8",
+            "source": sources_meta["source"],
+            "merged_sources": sources_meta["merged_sources"],
             "extracted_by": "scripts/extract_bs_calendar_data.py",
             "reference_ad": "1913-04-13",
             "reference_bs": {"year": 1970, "month": 1, "day": 1},
@@ -104,6 +242,7 @@ def build_output(years: dict[str, list[int]]) -> dict:
                 max(int(k) for k in years),
             ],
             "nepal_tz_offset_seconds": 20700,
+            "input_hash": input_hash,
         },
         "month_names_en": [
             "Baisakh", "Jestha", "Ashadh", "Shrawan",
@@ -128,12 +267,74 @@ def build_output(years: dict[str, list[int]]) -> dict:
     }
 
 
+def write_snapshot(years: dict[str, list[int]]) -> None:
+    """Write the vendored snapshot, one year per line for readable diffs."""
+    SNAPSHOT.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f'    "{year}": {json.dumps(values)}' for year, values in years.items()]
+    with open(SNAPSHOT, "w") as f:
+        f.write(f'{{\n  "source": "nepali_utils {NEPALI_UTILS_VERSION} _nepaliYears",\n  "years": {{\n')
+        f.write(",\n".join(lines))
+        f.write("\n  }\n}\n")
+
+
 def main() -> None:
-    print(f"Reading Dart source: {DART_SOURCE}", file=sys.stderr)
-    years = parse_nepali_years(DART_SOURCE)
+    parser = argparse.ArgumentParser(description="Extract BS calendar month-length tables")
+    parser.add_argument(
+        "--sources", default="dart,snapshot,json",
+        help="Comma-separated sources in priority order (default: dart,snapshot,json)",
+    )
+    parser.add_argument("--strict", action="store_true", help="Fail if sources disagree")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the input hash is unchanged")
+    parser.add_argument("--update-snapshot", action="store_true", help="Refresh the vendored snapshot from the Dart source")
+    args = parser.parse_args()
+
+    if args.update_snapshot:
+        source = DartSource(DART_SOURCE)
+        if not source.available():
+            print(f"ERROR: Dart source not found at {DART_SOURCE}", file=sys.stderr)
+            print(f"Install nepali_utils {NEPALI_UTILS_VERSION}: flutter pub add nepali_utils", file=sys.stderr)
+            sys.exit(1)
+        write_snapshot(source.load())
+        print(f"Written to: {SNAPSHOT}", file=sys.stderr)
+        return
+
+    names = [n.strip() for n in args.sources.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SOURCES]
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(unknown)} (choose from {', '.join(SOURCES)})")
+
+    sources = [SOURCES[n]() for n in names]
+    years, origin, conflicts = merge_sources(sources)
+    if not years:
+        print("ERROR: No year data found in any source", file=sys.stderr)
+        sys.exit(1)
+
+    for conflict in conflicts:
+        print(f"CONFLICT: {conflict}", file=sys.stderr)
+    if conflicts and args.strict:
+        sys.exit(1)
+
+    used = sorted(set(origin.values()), key=names.index)
+    print(f"Merged {len(years)} years from: {', '.join(used)}", file=sys.stderr)
+
+    sources_meta = provenance(sources, origin)
+    input_hash = table_hash(years, sources_meta)
+    if not args.force and existing_hash() == input_hash:
+        print(f"Inputs unchanged (sha256 {input_hash[:12]}); skipping regeneration.", file=sys.stderr)
+        return
+
     validate_years(years)
 
-    output = build_output(years)
+    output = build_output(years, sources_meta, input_hash)
+
+    # Refuse to write a table that does not round-trip every day or
+    # contradicts the independent anchors and year lengths
+    calendar = BsCalendar(output)
+    errors, _ = verify_calendar(calendar)  # warnings repeat the placeholder NOTE above
+    if errors:
+        for error in errors:
+            print(f"ERROR: {error}", file=sys.stderr)
+        sys.exit(1)
 
     OUTPUT.parent.mkdir(parents=True, exist_ok=True)
     with open(OUTPUT, "w") as f:
@@ -141,9 +342,16 @@ def main() -> None:
 
     print(f"Written to: {OUTPUT}", file=sys.stderr)
 
+    grid = calendar.month_grid()
+    with open(GRID_FILE, "w") as f:
+        json.dump(grid, f, separators=(",", ":"))
+
+    print(f"Written to: {GRID_FILE}", file=sys.stderr)
+
     # Quick verification
     data = json.loads(OUTPUT.read_text())
     assert len(data["years"]) == len(years)
+    assert len(json.loads(GRID_FILE.read_text())["month_length"]) == len(years) * 12
     print("Verification passed.", file=sys.stderr)
 
 
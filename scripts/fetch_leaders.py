@@ -5,13 +5,17 @@ Fetch Nepal political leaders data from ratemyneta.com API.
 This script:
 1. Fetches all leaders from the API
 2. Normalizes district names to match our districts.json
-3. Downloads leader images
-4. Generates leaders.json and parties.json
+3. Syncs leader images into a content-addressed store, re-downloading only
+   what changed (see leader_images.py and leader_image_store.py)
+4. Builds thumbnail and list-size variants of new photos (leader_image_variants.py)
+5. Generates leaders.json and parties.json
 
 Usage:
     python3 scripts/fetch_leaders.py
+    python3 scripts/fetch_leaders.py --workers 16 --per-host 4
 """
 
+import argparse
 import json
 import os
 import sys
@@ -22,11 +26,15 @@ from typing import Any, Dict, List
 
 import requests
 
+from leader_image_store import ImageStore
+from leader_image_variants import Image, build_variants
+from leader_images import ImageDownloader
 
 # Configuration
 API_BASE = "https://api.ratemyneta.com/api"
 OUTPUT_DIR = Path(__file__).parent.parent / "assets" / "data"
 IMAGES_DIR = Path(__file__).parent.parent / "assets" / "images" / "leaders"
+IMAGE_MANIFEST = OUTPUT_DIR / "leader_images.json"
 DISTRICTS_FILE = Path(__file__).parent.parent / "districts.json"
 
 # District name normalization mapping (API returns -> our standard name)
@@ -201,29 +209,16 @@ def fetch_leaders() -> List[Dict[str, Any]]:
         return []
 
 
-def download_image(url: str, leader_id: str) -> str:
-    """Download leader image and return local path."""
-    if not url:
-        return None
-
-    # Create images directory
-    IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-
-    image_path = IMAGES_DIR / f"{leader_id}.jpg"
+def download_images(leaders: List[Dict[str, Any]], workers: int, per_host: int) -> Dict[str, str]:
+    """Sync all leader images into the image store; returns leader id -> local asset path."""
+    jobs = [(leader["_id"], leader["imageUrl"]) for leader in leaders if leader.get("imageUrl") and leader.get("_id")]
+    print(f"Checking {len(jobs)} images ({workers} workers, {per_host} per host)...")
 
+    downloader = ImageDownloader(workers=workers, per_host=per_host)
     try:
-        response = requests.get(url, timeout=30, stream=True)
-        response.raise_for_status()
-
-        with open(image_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        return f"assets/images/leaders/{leader_id}.jpg"
-
-    except requests.RequestException as e:
-        print(f"Warning: Failed to download image for {leader_id}: {e}", file=sys.stderr)
-        return None
+        return ImageStore(IMAGES_DIR, IMAGE_MANIFEST).sync(jobs, downloader)
+    finally:
+        downloader.close()
 
 
 def generate_parties(leaders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -286,6 +281,11 @@ def get_short_name(party: str) -> str:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Fetch leaders and parties from ratemyneta.com")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent image downloads")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent image downloads per host")
+    args = parser.parse_args()
+
     # Load district mapping
     load_districts()
     print(f"Loaded {len(SVG_TO_NAME)} district mappings")
@@ -298,6 +298,13 @@ def main():
         print("No leaders fetched. Exiting.", file=sys.stderr)
         sys.exit(1)
 
+    # Download images
+    image_paths = download_images(leaders, args.workers, args.per_host)
+    if Image is not None:
+        build_variants(IMAGES_DIR, IMAGE_MANIFEST)
+    else:
+        print("Warning: Pillow not installed, image variants not updated", file=sys.stderr)
+
     # Normalize leader data
     normalized_leaders = []
     for leader in leaders:
@@ -317,11 +324,9 @@ def main():
             ),
         }
 
-        # Download image if URL exists
-        if leader.get("imageUrl"):
-            local_path = download_image(leader["imageUrl"], leader["_id"])
-            if local_path:
-                normalized["imageUrl"] = local_path
+        # Point at the downloaded image if it succeeded
+        if leader.get("_id") in image_paths:
+            normalized["imageUrl"] = image_paths[leader["_id"]]
 
         normalized_leaders.append(normalized)
 
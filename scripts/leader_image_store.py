@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Content-addressed leader image store with conditional re-download.
+
+Images live in assets/images/leaders/ named by content: <sha256[:16]>.jpg.
+Leaders sharing a photo share one file, and a file's bytes never change
+once written: a new photo is a new file, and files no leader references
+any more are removed. A manifest (assets/data/leader_images.json) maps
+every leader id to its image hash, the URL it came from and that URL's
+ETag / Last-Modified.
+
+Each sync re-checks every leader with a conditional request. A 304 keeps
+the image without downloading it (storing any new validators it carries). When the host sends no validators the
+full body is downloaded, but nothing is written if its hash matches the
+stored one. The manifest is rewritten only when an entry changed, so an
+unchanged weekly run leaves the tree untouched.
+
+Images from before the store (assets/images/leaders/<leader id>.jpg) are
+adopted on the first sync: hashed, renamed to their content name and
+de-duplicated.
+
+Usage:
+    from leader_image_store import ImageStore
+    store = ImageStore(IMAGES_DIR, OUTPUT_DIR / "leader_images.json")
+    paths = store.sync([(leader_id, url), ...], ImageDownloader())
+    paths[leader_id]   # "assets/images/leaders/3f2a9c0b1d4e5f60.jpg"
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from leader_images import DownloadResult, ImageDownloader, report
+
+BLOB_NAME = re.compile(r"^[0-9a-f]{16}\.jpg$")
+ASSET_PREFIX = "assets/images/leaders/"
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_name(sha256: str) -> str:
+    return f"{sha256[:16]}.jpg"
+
+
+class ImageStore:
+    def __init__(self, images_dir: Path, manifest_path: Path):
+        self.images_dir = images_dir
+        self.manifest_path = manifest_path
+        self.entries: dict[str, dict] = {}
+        if manifest_path.exists():
+            with open(manifest_path, encoding="utf-8") as f:
+                self.entries = json.load(f)["leaders"]
+        self._saved = json.dumps(self.entries, sort_keys=True)
+
+    def _blob(self, entry: dict) -> Path:
+        return self.images_dir / blob_name(entry["sha256"])
+
+    def _add_blob(self, download: Path, sha256: str) -> bool:
+        """Move a downloaded file into place under its content name; False if already stored."""
+        blob = self.images_dir / blob_name(sha256)
+        if blob.exists():
+            download.unlink()
+            return False
+        os.replace(download, blob)
+        return True
+
+    def adopt_legacy(self) -> int:
+        """Hash pre-store <leader id>.jpg files into the store; returns files adopted."""
+        adopted = 0
+        for path in sorted(self.images_dir.glob("*.jpg")):
+            if BLOB_NAME.match(path.name):
+                continue
+            leader_id = path.stem
+            sha256 = file_hash(path)
+            if leader_id not in self.entries:
+                # No URL or validators yet: the first sync downloads once and
+                # compares hashes instead of trusting a 304
+                self.entries[leader_id] = {"sha256": sha256, "url": None}
+            self._add_blob(path, sha256)
+            adopted += 1
+        return adopted
+
+    def _job(self, leader_id: str, url: str) -> tuple:
+        download = self.images_dir / f".{leader_id}.download"
+        entry = self.entries.get(leader_id)
+        headers = {}
+        if entry and entry.get("url") == url and self._blob(entry).exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return leader_id, url, download, headers
+
+    def _apply(self, result: DownloadResult, counts: dict[str, int]) -> None:
+        entry = self.entries.get(result.leader_id)
+        if not result.ok:
+            counts["failed"] += 1
+            return
+        if result.not_modified:
+            counts["not_modified"] += 1
+            # A 304 may carry updated validators (RFC 9110 15.4.5); keep them
+            # for the next conditional request
+            if result.etag:
+                entry["etag"] = result.etag
+            if result.last_modified:
+                entry["last_modified"] = result.last_modified
+            return
+
+        if entry and entry["sha256"] == result.sha256 and self._blob(entry).exists():
+            result.path.unlink()
+            counts["unchanged"] += 1
+        elif self._add_blob(result.path, result.sha256):
+            counts["new_files"] += 1
+        else:
+            counts["deduplicated"] += 1
+
+        self.entries[result.leader_id] = {
+            "sha256": result.sha256,
+            "url": result.url,
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+        }
+
+    def collect_garbage(self) -> int:
+        """Delete content files no manifest entry points at; returns files removed."""
+        referenced = {blob_name(entry["sha256"]) for entry in self.entries.values()}
+        removed = 0
+        for path in self.images_dir.glob("*.jpg"):
+            if BLOB_NAME.match(path.name) and path.name not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def save(self) -> bool:
+        """Write the manifest if any entry changed; returns whether it was written."""
+        current = json.dumps(self.entries, sort_keys=True)
+        if current == self._saved and self.manifest_path.exists():
+            return False
+        document = {
+            "count": len(self.entries),
+            "files": len({entry["sha256"] for entry in self.entries.values()}),
+            "leaders": dict(sorted(self.entries.items())),
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp, self.manifest_path)
+        self._saved = current
+        return True
+
+    def sync(self, leaders: list[tuple[str, str]], downloader: ImageDownloader) -> dict[str, str]:
+        """
+        Bring the store up to date with (leader_id, image URL) pairs and
+        return leader id -> asset path for every leader with an image,
+        including ones whose download failed this run but were stored before.
+        """
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        adopted = self.adopt_legacy()
+        if adopted:
+            print(f"Adopted {adopted} existing images into the store", file=sys.stderr)
+
+        results = downloader.download_all([self._job(leader_id, url) for leader_id, url in leaders])
+        counts = dict.fromkeys(("not_modified", "unchanged", "new_files", "deduplicated", "failed"), 0)
+        for result in results:
+            self._apply(result, counts)
+        report(results)
+
+        # Leaders that are gone from the API drop out of the manifest
+        current = {leader_id for leader_id, _ in leaders}
+        self.entries = {k: v for k, v in self.entries.items() if k in current}
+        removed = self.collect_garbage()
+        written = self.save()
+
+        print(
+            f"Image store: {counts['not_modified']} not modified, {counts['unchanged']} same bytes, "
+            f"{counts['new_files']} new files, {counts['deduplicated']} deduplicated, "
+            f"{counts['failed']} failed, {removed} removed; manifest {'written' if written else 'unchanged'}",
+            file=sys.stderr,
+        )
+        return {k: ASSET_PREFIX + blob_name(v["sha256"]) for k, v in self.entries.items()}
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Fixed-size variants of the stored leader photos for list and map screens.
+
+Every source photo in the image store (leader_image_store.py) is cropped
+to squares sized for the app's avatars and re-encoded as WebP (or
+progressive JPEG, also the fallback when Pillow lacks WebP support) with
+EXIF, ICC and other metadata stripped:
+
+    thumb   120 x 120   40 dp map avatars at 3x
+    list    192 x 192   64 dp list avatars at 3x
+
+Variants are named <source sha256[:16]>_<variant>.<ext>, so work is cached
+by source hash: only photos not processed before (with the same format and
+quality) are rendered, in a process pool. Variants of photos no leader
+uses any more are removed.
+
+assets/images/leaders/variants/manifest.json maps leader ids to their
+variant asset paths for the app to pick from. It also keeps each source's
+byte counts, which the bytes-saved report is computed from.
+
+Leaders not in the store manifest yet (committed <leader id>.jpg files from
+before the store) are hashed in place.
+
+Usage:
+    python3 scripts/leader_image_variants.py                  # WebP variants of every stored photo
+    python3 scripts/leader_image_variants.py --format jpeg    # Progressive JPEG instead
+    python3 scripts/leader_image_variants.py --workers 4 --force
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+from leader_image_store import ASSET_PREFIX, BLOB_NAME, blob_name, file_hash
+
+ROOT = Path(__file__).parent.parent
+IMAGES_DIR = ROOT / "assets" / "images" / "leaders"
+STORE_MANIFEST = ROOT / "assets" / "data" / "leader_images.json"
+
+VARIANTS = {"thumb": 120, "list": 192}
+QUALITY = {"webp": 80, "jpeg": 82}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+VARIANT_NAME = re.compile(r"^[0-9a-f]{16}_\w+\.(webp|jpg)$")
+
+
+def load_sources(images_dir: Path, store_manifest: Path) -> dict[str, tuple[str, Path]]:
+    """leader id -> (source sha256, source file) for every leader with a stored photo."""
+    sources = {}
+    if store_manifest.exists():
+        with open(store_manifest, encoding="utf-8") as f:
+            for leader_id, entry in json.load(f)["leaders"].items():
+                path = images_dir / blob_name(entry["sha256"])
+                if path.exists():
+                    sources[leader_id] = (entry["sha256"], path)
+    for path in sorted(images_dir.glob("*.jpg")):
+        if not BLOB_NAME.match(path.name) and path.stem not in sources:
+            sources[path.stem] = (file_hash(path), path)
+    return sources
+
+
+def render(source: Path, sha256: str, out_dir: Path, fmt: str, quality: int) -> dict:
+    """Write every variant of one photo; returns {"bytes": ..., "variants": {name: {...}}}."""
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+        # Nothing from the source (EXIF, ICC profile, comments) is carried over
+        image.info = {}
+
+        variants = {}
+        for name, size in VARIANTS.items():
+            # Portraits: keep the upper part of the frame, where the face is
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS, centering=(0.5, 0.35))
+            path = out_dir / f"{sha256[:16]}_{name}.{EXTENSIONS[fmt]}"
+            tmp = path.with_name(path.name + ".tmp")
+            if fmt == "webp":
+                variant.save(tmp, "WEBP", quality=quality, method=6)
+            else:
+                variant.save(tmp, "JPEG", quality=quality, progressive=True, optimize=True)
+            os.replace(tmp, path)
+            variants[name] = {"file": path.name, "bytes": path.stat().st_size}
+    return {"bytes": source.stat().st_size, "variants": variants}
+
+
+def _render_job(job: tuple) -> tuple[str, dict | None]:
+    source, sha256, out_dir, fmt, quality = job
+    try:
+        return sha256, render(Path(source), sha256, Path(out_dir), fmt, quality)
+    except OSError as e:  # unreadable or truncated photo
+        print(f"Warning: could not render {source}: {e}", file=sys.stderr)
+        return sha256, None
+
+
+def build_variants(
+    images_dir: Path = IMAGES_DIR,
+    store_manifest: Path = STORE_MANIFEST,
+    out_dir: Path | None = None,
+    fmt: str = "webp",
+    workers: int = os.cpu_count() or 1,
+    force: bool = False,
+) -> dict:
+    """Bring the variants and their manifest up to date; returns the manifest."""
+    if Image is None:
+        raise RuntimeError("Pillow is required: pip install pillow")
+    if fmt == "webp" and not features.check("webp"):
+        print("Warning: this Pillow build has no WebP support; writing progressive JPEG variants", file=sys.stderr)
+        fmt = "jpeg"
+
+    out_dir = out_dir or images_dir / "variants"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.json"
+    settings = {"format": fmt, "quality": QUALITY[fmt], "sizes": VARIANTS}
+
+    previous = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    cache = previous.get("sources", {}) if previous.get("settings") == settings and not force else {}
+
+    sources = load_sources(images_dir, store_manifest)
+    unique = {sha256: path for sha256, path in sources.values()}
+
+    def cached(sha256: str) -> bool:
+        entry = cache.get(sha256)
+        return entry is not None and all((out_dir / v["file"]).exists() for v in entry["variants"].values())
+
+    jobs = [(str(path), sha256, str(out_dir), fmt, QUALITY[fmt]) for sha256, path in unique.items() if not cached(sha256)]
+    print(f"Variants: {len(unique)} source photos, {len(unique) - len(jobs)} cached, {len(jobs)} to render", file=sys.stderr)
+
+    processed = {sha256: cache[sha256] for sha256 in unique if cached(sha256)}
+    started = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        rendered = list(map(_render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    processed.update((sha256, entry) for sha256, entry in rendered if entry is not None)
+    if jobs:
+        print(f"  rendered {len(jobs)} photos in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    # Drop variants of photos no leader uses any more
+    referenced = {v["file"] for entry in processed.values() for v in entry["variants"].values()}
+    for path in out_dir.iterdir():
+        if VARIANT_NAME.match(path.name) and path.name not in referenced:
+            path.unlink()
+
+    prefix = ASSET_PREFIX + out_dir.name + "/"
+    manifest = {
+        "settings": settings,
+        "leaders": {
+            leader_id: {name: prefix + v["file"] for name, v in processed[sha256]["variants"].items()}
+            for leader_id, (sha256, _) in sorted(sources.items())
+            if sha256 in processed
+        },
+        "sources": dict(sorted(processed.items())),
+    }
+    if manifest != previous:
+        tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp, manifest_path)
+
+    report(manifest)
+    return manifest
+
+
+def report(manifest: dict) -> None:
+    """Bytes the app loads per variant versus the original photos."""
+    sources = manifest["sources"].values()
+    original = sum(entry["bytes"] for entry in sources)
+    print(f"Originals: {len(sources)} photos, {original / 1e6:.2f} MB", file=sys.stderr)
+    if not original:
+        return
+    for name in manifest["settings"]["sizes"]:
+        size = sum(entry["variants"][name]["bytes"] for entry in sources)
+        saved = original - size
+        print(f"  {name:6} {size / 1e6:6.2f} MB, {saved / 1e6:.2f} MB saved ({saved / original:.1%} smaller)",
+              file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build thumbnail and list-size variants of leader photos")
+    parser.add_argument("--images", type=Path, default=IMAGES_DIR, help="Image store directory")
+    parser.add_argument("--store-manifest", type=Path, default=STORE_MANIFEST, help="Image store manifest")
+    parser.add_argument("-o", "--output", type=Path, help="Variants directory (default: <images>/variants)")
+    parser.add_argument("--format", choices=sorted(QUALITY), default="webp", help="Output format")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Render processes")
+    parser.add_argument("--force", action="store_true", help="Re-render every photo, ignoring the cache")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Pillow is required: pip install pillow", file=sys.stderr)
+        sys.exit(1)
+
+    build_variants(args.images, args.store_manifest, args.output, args.format, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
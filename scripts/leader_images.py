@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Pooled concurrent image downloader for fetch_leaders.py.
+
+One requests.Session is shared by a bounded thread pool, so connections
+(and TLS sessions) are reused across leaders instead of opening one per
+image. Each host gets at most `per_host` requests in flight. Failed
+requests (connection errors, 429 and 5xx) are retried with exponential
+backoff. Images are written to a temp file and moved into place, so a
+failed download never leaves a truncated .jpg behind.
+
+A job may carry conditional headers (If-None-Match / If-Modified-Since);
+a 304 answer is reported as not_modified without touching the file. Every
+downloaded body is hashed (SHA-256) while it streams, for
+leader_image_store.py.
+
+A local stand-in serving the committed images makes the downloader
+testable offline. It answers conditional requests (ETag and
+Last-Modified); --latency and --fail-every simulate a slow, flaky host
+whose failures alternate between a 503 and a body cut off halfway:
+    python3 scripts/leader_images.py --serve assets/images/leaders --port 8766 --latency 0.05 --fail-every 7
+    python3 scripts/leader_images.py --base-url http://127.0.0.1:8766/ --ids assets/images/leaders -o /tmp/leaders --compare
+    python3 scripts/leader_images.py --base-url http://127.0.0.1:8766/ --ids assets/images/leaders -o /tmp/leaders \\
+        --manifest /tmp/leader_images.json   # sync through the content-addressed store instead
+
+--check runs the downloader against the stand-in in a thread, failing every
+--fail-every'th request (default 4), and verifies that every image arrives
+intact after retries with no .part files of the cut-off bodies left behind:
+    python3 scripts/leader_images.py --check
+
+Usage:
+    from leader_images import ImageDownloader, report
+    downloader = ImageDownloader(workers=8, per_host=4)
+    results = downloader.download_all([(leader_id, url, path), ...])
+    report(results)
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "civic-nepal-data/1.0"
+
+
+@dataclass
+class DownloadResult:
+    leader_id: str
+    url: str
+    path: Path
+    size: int = 0
+    seconds: float = 0.0
+    attempts: int = 0
+    error: str | None = None
+    not_modified: bool = False
+    sha256: str | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class HostLimiter:
+    """At most `limit` concurrent requests per host."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[host]
+
+
+class ImageDownloader:
+    def __init__(
+        self,
+        workers: int = 8,
+        per_host: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 30,
+    ):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.host_slot = HostLimiter(per_host)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _fetch(self, result: DownloadResult, headers: dict | None) -> None:
+        """One attempt: stream the body to a temp file while hashing it, then replace path."""
+        path = result.path
+        tmp = path.with_name(path.name + ".part")
+        with self.host_slot(result.url):
+            with self.session.get(result.url, headers=headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                result.etag = response.headers.get("ETag")
+                result.last_modified = response.headers.get("Last-Modified")
+                if response.status_code == 304:
+                    result.not_modified = True
+                    return
+                digest = hashlib.sha256()
+                size = 0
+                with open(tmp, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+        os.replace(tmp, path)
+        result.size = size
+        result.sha256 = digest.hexdigest()
+
+    def download(self, leader_id: str, url: str, path: Path, headers: dict | None = None) -> DownloadResult:
+        result = DownloadResult(leader_id, url, path)
+        started = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            try:
+                self._fetch(result, headers)
+                result.error = None
+                break
+            except requests.RequestException as e:
+                result.error = str(e)
+                status = e.response.status_code if e.response is not None else None
+                if attempt == self.retries or not (status is None or status == 429 or status >= 500):
+                    break
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+            finally:
+                path.with_name(path.name + ".part").unlink(missing_ok=True)
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def download_all(self, jobs: list[tuple]) -> list[DownloadResult]:
+        """
+        Download (leader_id, url, path) or (leader_id, url, path, headers)
+        jobs; results come back in job order.
+        """
+        for job in jobs:
+            job[2].parent.mkdir(parents=True, exist_ok=True)
+        results: list[DownloadResult | None] = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.download, *job): i for i, job in enumerate(jobs)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if done % 50 == 0:
+                    print(f"  {done}/{len(jobs)} images", file=sys.stderr)
+        return results
+
+
+def report(results: list[DownloadResult], elapsed: float | None = None) -> None:
+    """Throughput summary plus one line per leader whose image failed."""
+    ok = [r for r in results if r.ok]
+    failed = [r for r in results if not r.ok]
+    size = sum(r.size for r in ok)
+    retried = sum(1 for r in results if r.attempts > 1)
+    not_modified = sum(1 for r in ok if r.not_modified)
+    if elapsed is None:
+        elapsed = max((r.seconds for r in results), default=0.0)
+    rate = f"{len(ok) / elapsed:.1f} images/s, {size / elapsed / 1e6:.2f} MB/s" if elapsed else "-"
+    print(
+        f"Images: {len(ok)}/{len(results)} fetched ({size / 1e6:.1f} MB) in {elapsed:.1f}s "
+        f"({rate}); {not_modified} not modified, {retried} needed retries",
+        file=sys.stderr,
+    )
+    for r in failed:
+        print(f"  FAILED {r.leader_id} after {r.attempts} attempts: {r.error}", file=sys.stderr)
+
+
+class StandInImages(SimpleHTTPRequestHandler):
+    """
+    Static image server with optional latency and every-Nth-request failures:
+    alternately a 503 and a response closed halfway through the body.
+    Adds an ETag (mtime-size, like nginx) and honours If-None-Match;
+    If-Modified-Since is handled by SimpleHTTPRequestHandler.
+    """
+
+    latency = 0.0
+    fail_every = 0
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            StandInImages.requests_seen += 1
+            fail = self.fail_every and StandInImages.requests_seen % self.fail_every == 0
+            truncate = fail and (StandInImages.requests_seen // self.fail_every) % 2 == 0
+        time.sleep(self.latency)
+        if truncate and os.path.isfile(self.translate_path(self.path)):
+            with open(self.translate_path(self.path), "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        if fail:
+            self.send_error(503)
+            return
+        try:
+            stat = os.stat(self.translate_path(self.path))
+            self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        except OSError:
+            self.etag = None
+        if self.etag and self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def end_headers(self):
+        if getattr(self, "etag", None):
+            self.send_header("ETag", self.etag)
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_images(directory: Path, port: int, latency: float = 0.0, fail_every: int = 0) -> ThreadingHTTPServer:
+    StandInImages.latency = latency
+    StandInImages.fail_every = fail_every
+    StandInImages.requests_seen = 0
+    return ThreadingHTTPServer(("127.0.0.1", port), partial(StandInImages, directory=str(directory)))
+
+
+def serial_download(jobs: list[tuple[str, str, Path]]) -> list[DownloadResult]:
+    """The previous behaviour: a fresh requests.get per image, one at a time, no retries."""
+    results = []
+    for leader_id, url, path in jobs:
+        result = DownloadResult(leader_id, url, path, attempts=1)
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, timeout=30, stream=True)
+            response.raise_for_status()
+            result.size = len(response.content)
+            path.write_bytes(response.content)
+        except requests.RequestException as e:
+            result.error = str(e)
+        result.seconds = time.perf_counter() - started
+        results.append(result)
+    return results
+
+
+def check(fail_every: int = 4, count: int = 24) -> None:
+    """Pooled download of generated images from a stand-in failing every Nth request."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = Path(tmp) / "source", Path(tmp) / "output"
+        source.mkdir()
+        rng = random.Random(fail_every)
+        for i in range(count):
+            (source / f"leader_{i:03d}.jpg").write_bytes(rng.randbytes(rng.randint(1_000, 200_000)))
+
+        server = serve_images(source, 0, latency=0.01, fail_every=fail_every)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+        jobs = [(p.stem, base_url + p.name, output / p.name) for p in sorted(source.glob("*.jpg"))]
+        downloader = ImageDownloader(workers=4, per_host=4, retries=5, backoff=0.01)
+        try:
+            results = downloader.download_all(jobs)
+            served_errors = StandInImages.requests_seen // fail_every
+
+            # A host failing every request: nothing may be left in the output directory
+            StandInImages.fail_every = 1
+            broken = downloader.download_all([(leader_id, url, Path(tmp) / "broken" / path.name)
+                                              for leader_id, url, path in jobs])
+        finally:
+            downloader.close()
+            server.shutdown()
+            server.server_close()
+        report(results)
+
+        failed = [r.leader_id for r in results if not r.ok]
+        assert not failed, f"failed after retries: {failed}"
+        retries = sum(r.attempts - 1 for r in results)
+        assert retries == served_errors > 0, (retries, served_errors)
+        for r in results:
+            original = (source / r.path.name).read_bytes()
+            assert r.path.read_bytes() == original and r.sha256 == hashlib.sha256(original).hexdigest(), r.leader_id
+        leftovers = [p.name for p in output.iterdir() if p.suffix != ".jpg"]
+        assert not leftovers, leftovers
+
+        assert not any(r.ok for r in broken)
+        leftovers = [p.name for p in (Path(tmp) / "broken").iterdir()]
+        assert not leftovers, leftovers
+    print(f"OK: {count} images intact after {retries} retried failures; "
+          f"{len(broken)} failed downloads left no partial files", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Download leader images through a pooled downloader")
+    parser.add_argument("--base-url", help="Image host; <base-url><leader_id>.jpg is fetched per leader")
+    parser.add_argument("--ids", type=Path, help="Directory whose *.jpg names are the leader ids to fetch")
+    parser.add_argument("-o", "--output", type=Path, default=Path("leader_images"), help="Output directory")
+    parser.add_argument("--workers", type=int, default=8, help="Download threads")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per host")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per image")
+    parser.add_argument("--compare", action="store_true", help="Also time the old serial download")
+    parser.add_argument("--manifest", type=Path, help="Sync into a content-addressed store with this manifest")
+    parser.add_argument("--serve", type=Path, metavar="DIR", help="Run a stand-in serving DIR instead")
+    parser.add_argument("--port", type=int, default=8766, help="Stand-in port")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in delay per request (seconds)")
+    parser.add_argument("--fail-every", type=int, default=0, help="Stand-in answers every Nth request with 503")
+    parser.add_argument("--check", action="store_true", help="Download from a flaky stand-in and verify the results")
+    args = parser.parse_args()
+
+    if args.check:
+        check(args.fail_every or 4)
+        return
+
+    if args.serve:
+        server = serve_images(args.serve, args.port, args.latency, args.fail_every)
+        print(f"Serving {args.serve} on http://127.0.0.1:{args.port}/", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not args.base_url or not args.ids:
+        parser.error("--base-url and --ids are required unless --serve is given")
+    base_url = args.base_url.rstrip("/") + "/"
+    jobs = [(p.stem, f"{base_url}{p.name}", args.output / p.name) for p in sorted(args.ids.glob("*.jpg"))]
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    if args.manifest:
+        from leader_image_store import ImageStore
+
+        downloader = ImageDownloader(args.workers, args.per_host, args.retries)
+        store = ImageStore(args.output, args.manifest)
+        paths = store.sync([(leader_id, url) for leader_id, url, _ in jobs], downloader)
+        downloader.close()
+        if len(paths) < len(jobs):
+            sys.exit(1)
+        return
+
+    if args.compare:
+        print(f"Serial: {len(jobs)} images...", file=sys.stderr)
+        started = time.perf_counter()
+        report(serial_download(jobs), time.perf_counter() - started)
+
+    print(f"Pooled ({args.workers} workers, {args.per_host} per host): {len(jobs)} images...", file=sys.stderr)
+    downloader = ImageDownloader(args.workers, args.per_host, args.retries)
+    started = time.perf_counter()
+    results = downloader.download_all(jobs)
+    report(results, time.perf_counter() - started)
+    downloader.close()
+    if any(not r.ok for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
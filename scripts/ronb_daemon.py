@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Long-running RONB poller: scrape_ronb.py on an adaptive interval.
+
+Each poll fetches the page and upserts its posts into a PostStore in a
+worker thread, so neither the network nor SQLite blocks the event loop, and
+atomically replaces the delta, metrics and (when it gained posts) rolling
+feed files: write a temp file, then os.replace. The interval halves
+when a poll finds new posts, grows by half when it finds none and doubles
+(with jitter) after an error, always within [--min-interval, --max-interval].
+
+Metrics (--metrics) cover poll latency (fetch + parse + store) and, per
+poll, the posts extracted from the page and how many of them were new.
+
+A local stand-in serving recorded pages makes the loop testable offline;
+every request serves the next page of the directory in name order and the
+last page repeats:
+    python3 scripts/ronb_daemon.py --serve pages/ --port 8765
+    python3 scripts/ronb_daemon.py --url http://127.0.0.1:8765/ --min-interval 1 --max-polls 5 \\
+        --store /tmp/ronb.db -o /tmp/ronb_feed.json --delta /tmp/ronb_delta.json
+
+--check runs three polls against the stand-in serving generated pages and
+verifies the counts, the interval changes and the written files.
+
+Usage:
+    python3 scripts/ronb_daemon.py --store data/ronb_posts.db -o data/ronb_feed.json \\
+        --delta data/ronb_feed_delta.json --metrics data/ronb_metrics.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ronb_store import PostStore
+from scrape_ronb import DEFAULT_WINDOW, FACEBOOK_PAGE, PAGE_URL, extract_posts, feed_document, fetch_page
+
+
+def write_atomic(path: Path, document: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class AdaptiveInterval:
+    """Polling interval that speeds up on activity and backs off when idle or failing."""
+
+    def __init__(self, start: float, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.value = min(max(start, minimum), maximum)
+
+    def _clamp(self, value: float) -> float:
+        self.value = min(max(value, self.minimum), self.maximum)
+        return self.value
+
+    def on_success(self, new_posts: int) -> float:
+        return self._clamp(self.value / 2 if new_posts else self.value * 1.5)
+
+    def on_error(self) -> float:
+        return self._clamp(self.value * 2 * (0.75 + random.random() / 2))
+
+
+class PollMetrics:
+    def __init__(self, history: int = 100):
+        self.polls = 0
+        self.errors = 0
+        self.extracted = 0
+        self.new_posts = 0
+        self.latencies: deque[float] = deque(maxlen=history)
+        self.extracted_per_poll: deque[int] = deque(maxlen=history)
+        self.new_per_poll: deque[int] = deque(maxlen=history)
+        self.started_at = datetime.now(tz=timezone.utc)
+
+    def record(self, latency: float, extracted: int, new_posts: int) -> None:
+        self.polls += 1
+        self.extracted += extracted
+        self.new_posts += new_posts
+        self.latencies.append(latency)
+        self.extracted_per_poll.append(extracted)
+        self.new_per_poll.append(new_posts)
+
+    def snapshot(self, interval: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "started_at": self.started_at.isoformat(),
+            "updated_at": datetime.now(tz=timezone.utc).isoformat(),
+            "polls": self.polls,
+            "errors": self.errors,
+            "extracted_posts_total": self.extracted,
+            "new_posts_total": self.new_posts,
+            "interval_seconds": round(interval, 1),
+            "latency_ms": {
+                "last": round(self.latencies[-1] * 1000, 1) if latencies else None,
+                "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                "p95": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None,
+            },
+            "posts_per_poll": {
+                "extracted": self._last_and_mean(self.extracted_per_poll),
+                "new": self._last_and_mean(self.new_per_poll),
+            },
+        }
+
+    @staticmethod
+    def _last_and_mean(values: deque[int]) -> dict:
+        return {
+            "last": values[-1] if values else None,
+            "mean": round(sum(values) / len(values), 2) if values else None,
+        }
+
+
+def fetch_and_store(url: str, store: PostStore) -> tuple[int, int, list[dict], datetime]:
+    """The blocking part of a poll: (posts extracted, run id, new posts, scrape time)."""
+    posts = extract_posts(fetch_page(url))
+    scraped_at = datetime.now(tz=timezone.utc)
+    run, new_posts = store.upsert(posts, scraped_at.isoformat())
+    return len(posts), run, new_posts, scraped_at
+
+
+async def poll_once(args, store: PostStore) -> tuple[int, int]:
+    """One fetch → extract → upsert → write cycle; returns (posts extracted, new posts)."""
+    extracted, run, new_posts, scraped_at = await asyncio.to_thread(fetch_and_store, args.url, store)
+
+    if args.delta:
+        delta = feed_document(new_posts, scraped_at)
+        delta["run"] = run
+        delta["previous_run"] = store.previous_run(run)
+        write_atomic(args.delta, delta)
+    if args.output and (new_posts or not args.output.exists()):
+        write_atomic(args.output, feed_document(store.latest(args.window), scraped_at))
+    return extracted, len(new_posts)
+
+
+async def run_daemon(args) -> dict:
+    # The store is used from worker threads, one poll at a time
+    store = PostStore(args.store, near_duplicates=args.near_dup, threaded=True)
+    interval = AdaptiveInterval(args.interval, args.min_interval, args.max_interval)
+    metrics = PollMetrics()
+
+    try:
+        while args.max_polls is None or metrics.polls + metrics.errors < args.max_polls:
+            started = time.perf_counter()
+            try:
+                extracted, new_posts = await poll_once(args, store)
+            except Exception as e:  # network, HTTP and parse errors all back off
+                metrics.errors += 1
+                wait = interval.on_error()
+                print(f"Poll failed ({e}); retrying in {wait:.0f}s", file=sys.stderr)
+            else:
+                latency = time.perf_counter() - started
+                metrics.record(latency, extracted, new_posts)
+                wait = interval.on_success(new_posts)
+                print(
+                    f"Poll {metrics.polls}: {extracted} posts, {new_posts} new in {latency * 1000:.0f} ms; "
+                    f"next in {wait:.0f}s",
+                    file=sys.stderr,
+                )
+
+            if args.metrics:
+                write_atomic(args.metrics, metrics.snapshot(interval.value))
+            if args.max_polls is not None and metrics.polls + metrics.errors >= args.max_polls:
+                break
+            await asyncio.sleep(wait)
+    finally:
+        store.close()
+    return metrics.snapshot(interval.value)
+
+
+class FixturePages(BaseHTTPRequestHandler):
+    """Serves the next recorded page on every GET; the last one repeats."""
+
+    pages: list[Path] = []
+    served = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            page = self.pages[min(FixturePages.served, len(self.pages) - 1)]
+            FixturePages.served += 1
+        body = page.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        print(f"stand-in: served {page.name}", file=sys.stderr)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures(directory: Path, port: int) -> ThreadingHTTPServer:
+    FixturePages.pages = sorted(p for p in directory.iterdir() if p.is_file())
+    FixturePages.served = 0
+    if not FixturePages.pages:
+        raise SystemExit(f"No pages in {directory}")
+    return ThreadingHTTPServer(("127.0.0.1", port), FixturePages)
+
+
+def check_page(count: int) -> str:
+    """A page with the first `count` of a fixed series of posts, shaped like the Facebook payload."""
+    return "".join(
+        f'<div>{"x" * 200}</div>"message":{{"text":"Check post {i}: \\u0915\\u093e\\u0920\\u092e\\u093e\\u0921\\u094c\\u0902"}},'
+        f'"creation_time":{1700000000 + i * 60},'
+        f'"url":"https://www.facebook.com/{FACEBOOK_PAGE}/posts/check{i:04d}"'
+        for i in range(count)
+    )
+
+
+def check() -> None:
+    """Three polls through the stand-in: 10 posts, 4 more, then nothing new."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pages = tmp / "pages"
+        pages.mkdir()
+        for name, count in (("1.html", 10), ("2.html", 14), ("3.html", 14)):
+            (pages / name).write_text(check_page(count), encoding="utf-8")
+
+        server = serve_fixtures(pages, 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args = argparse.Namespace(
+            url=f"http://127.0.0.1:{server.server_address[1]}/",
+            store=tmp / "posts.db", output=tmp / "feed.json", delta=tmp / "delta.json",
+            metrics=tmp / "metrics.json", window=DEFAULT_WINDOW, near_dup=False,
+            # New posts halve the interval, a quiet poll grows it by half
+            interval=0.8, min_interval=0.2, max_interval=0.9, max_polls=3,
+        )
+        try:
+            summary = asyncio.run(run_daemon(args))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert summary["polls"] == 3 and summary["errors"] == 0, summary
+        assert summary["extracted_posts_total"] == 38 and summary["new_posts_total"] == 14, summary
+        assert summary["posts_per_poll"]["new"]["last"] == 0, summary
+        assert summary["interval_seconds"] == 0.3, summary  # 0.8 -> 0.4 -> 0.2 -> 0.3
+
+        feed = json.loads(args.output.read_text(encoding="utf-8"))
+        delta = json.loads(args.delta.read_text(encoding="utf-8"))
+        assert feed["post_count"] == 14 and feed["posts"][0]["text"].startswith("Check post 13"), feed
+        assert delta["post_count"] == 0 and delta["previous_run"] == delta["run"] - 1, delta
+        assert json.loads(args.metrics.read_text(encoding="utf-8"))["polls"] == 3
+        leftovers = [p.name for p in tmp.iterdir() if p.name.endswith(".tmp")]
+        assert not leftovers, leftovers
+    print("OK: 3 polls, 38 posts extracted, 14 new, interval 0.8 -> 0.3 s, feed and delta written", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll the RONB page on an adaptive interval")
+    parser.add_argument("--url", default=PAGE_URL, help="Page to poll (point at a local stand-in for tests)")
+    parser.add_argument("--store", type=Path, default=Path("ronb_posts.db"), help="SQLite post store")
+    parser.add_argument("-o", "--output", type=Path, help="Rolling feed JSON")
+    parser.add_argument("--delta", type=Path, help="Delta JSON of posts new in the last poll")
+    parser.add_argument("--metrics", type=Path, help="Metrics JSON, rewritten after every poll")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Posts in the rolling feed")
+    parser.add_argument("--near-dup", action="store_true", help="Fold near-duplicate republished posts into one")
+    parser.add_argument("--interval", type=float, default=300, help="Initial seconds between polls")
+    parser.add_argument("--min-interval", type=float, default=60, help="Shortest interval")
+    parser.add_argument("--max-interval", type=float, default=1800, help="Longest interval")
+    parser.add_argument("--max-polls", type=int, help="Stop after this many polls")
+    parser.add_argument("--serve", type=Path, metavar="DIR", help="Run a stand-in serving recorded pages instead")
+    parser.add_argument("--port", type=int, default=8765, help="Stand-in port")
+    parser.add_argument("--check", action="store_true", help="Run three polls against a generated stand-in")
+    args = parser.parse_args()
+
+    if args.check:
+        check()
+        return
+
+    if args.serve:
+        server = serve_fixtures(args.serve, args.port)
+        print(f"Serving {len(FixturePages.pages)} pages on http://127.0.0.1:{args.port}/", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    print(f"Polling {args.url} every {args.interval:.0f}s "
+          f"({args.min_interval:.0f}-{args.max_interval:.0f}s)", file=sys.stderr)
+    try:
+        summary = asyncio.run(run_daemon(args))
+    except KeyboardInterrupt:
+        return
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
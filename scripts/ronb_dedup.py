@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for RONB posts with MinHash and LSH.
+
+RONB often republishes a post with small edits: a "Source: ..." line added
+or removed, different emoji, a corrected word. Texts are normalized
+(Unicode NFC, Devanagari nukta/chandrabindu/digit folding, emoji and
+punctuation dropped, "Source:" lines removed) and cut into character
+shingles. Each text becomes a MinHash signature whose agreement with
+another estimates their Jaccard similarity. Signatures are split into LSH
+bands, so a query only compares against posts sharing at least one band
+bucket instead of the whole history.
+
+Usage:
+    python3 scripts/ronb_dedup.py data/ronb_feed.json          # Print near-duplicate clusters
+    python3 scripts/ronb_dedup.py --store data/ronb_posts.db   # ... of the whole post history
+    python3 scripts/ronb_dedup.py --benchmark 50000            # LSH vs brute force on synthetic posts
+
+    from ronb_dedup import NearDuplicateIndex
+    index = NearDuplicateIndex()
+    index.add(1, text_a)
+    index.query(text_b)        # [(1, 0.82)]
+    index.cluster_of(2)        # 1 when post 2 is a variant of post 1
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Hashable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32          # 32 bands x 4 rows: pairs above ~0.45 Jaccard usually share a bucket
+THRESHOLD = 0.7     # estimated Jaccard needed to call two posts near-duplicates
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+SOURCE_LINE = re.compile(r"^\s*(?:source|sources|स्रोत)\s*[:：-].*$", re.I | re.M)
+URL = re.compile(r"https?://\S+")
+DEVANAGARI_FOLD = str.maketrans({
+    "\u093c": None,     # nukta
+    "\u0901": "\u0902",  # chandrabindu -> anusvara
+    "\u200c": None,     # zero-width non-joiner
+    "\u200d": None,     # zero-width joiner
+    "\ufe0e": None,     # text / emoji variation selectors: combining marks
+    "\ufe0f": None,     # that would survive the filter in normalize()
+    **{chr(0x0966 + d): str(d) for d in range(10)},  # Devanagari digits
+})
+
+
+def normalize(text: str) -> str:
+    """Fold a post to the characters that carry its content."""
+    text = SOURCE_LINE.sub(" ", text)
+    text = URL.sub(" ", text)
+    text = unicodedata.normalize("NFC", text).translate(DEVANAGARI_FOLD).lower()
+    # Keep letters, combining marks (Devanagari vowel signs) and digits
+    text = "".join(c if unicodedata.category(c)[0] in "LMN" else " " for c in text)
+    return " ".join(text.split())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    normalized = normalize(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """MinHash over shingle CRCs with NUM_PERM universal hashes (a*x + b) mod 2^31-1."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        if np is None:
+            raise RuntimeError("numpy is required: pip install numpy")
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text: str):
+        values = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) & MERSENNE_PRIME for s in shingles(text)),
+            dtype=np.uint64,
+        )
+        if not len(values):
+            return np.full(len(self.a), MERSENNE_PRIME, dtype=np.uint32)
+        return ((self.a * values + self.b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS, threshold: float = THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.signatures: dict[Hashable, object] = {}
+        self.buckets: list[dict[bytes, list[Hashable]]] = [{} for _ in range(bands)]
+        self.parent: dict[Hashable, Hashable] = {}
+
+    def _band_keys(self, signature) -> list[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _candidates(self, signature) -> set[Hashable]:
+        found = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            found.update(self.buckets[band].get(key, ()))
+        return found
+
+    def _matches(self, signature, exclude: Hashable = None) -> list[tuple[Hashable, float]]:
+        matches = []
+        for key in self._candidates(signature):
+            if key == exclude:
+                continue
+            similarity = float((self.signatures[key] == signature).mean())
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def query(self, text: str) -> list[tuple[Hashable, float]]:
+        """Indexed posts whose estimated Jaccard similarity to text passes the threshold."""
+        return self._matches(self.hasher.signature(text))
+
+    def add(
+        self, key: Hashable, text: str | None = None, signature=None, cluster: Hashable = None
+    ) -> list[tuple[Hashable, float]]:
+        """
+        Index a post by text or precomputed signature and return its
+        near-duplicates. Passing an already known cluster (a post reloaded
+        from a store) skips the search; the cluster must be indexed first.
+        """
+        if signature is None:
+            signature = self.hasher.signature(text)
+        matches = [] if cluster is not None else self._matches(signature, exclude=key)
+
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(band_key, []).append(key)
+        self.parent[key] = key if cluster is None or cluster == key else self._find(cluster)
+        for other, _ in matches:
+            self._union(key, other)
+        return matches
+
+    # Union-find over near-duplicate pairs so variants chain into one
+    # cluster, rooted at the smallest (earliest) key
+    def _find(self, key: Hashable) -> Hashable:
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def _union(self, a: Hashable, b: Hashable) -> None:
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def cluster_of(self, key: Hashable) -> Hashable:
+        return self._find(key)
+
+    def clusters(self, min_size: int = 2) -> list[list[Hashable]]:
+        groups: dict[Hashable, list[Hashable]] = {}
+        for key in self.parent:
+            groups.setdefault(self._find(key), []).append(key)
+        return [g for g in groups.values() if len(g) >= min_size]
+
+
+def load_posts(args) -> dict[int, str]:
+    if args.store:
+        from ronb_store import PostStore
+
+        store = PostStore(args.store)  # migrates stores from before post ids
+        posts = dict(store.conn.execute("SELECT id, text FROM posts ORDER BY id"))
+        store.close()
+        return posts
+    with open(args.feed, "r", encoding="utf-8") as f:
+        feed = json.load(f)
+    return {i: post["text"] for i, post in enumerate(feed["posts"])}
+
+
+def synthetic_posts(count: int, seed: int = 7) -> list[str]:
+    """Devanagari-like posts; every tenth is a lightly edited copy of an earlier one."""
+    rng = random.Random(seed)
+    letters = [chr(c) for c in range(0x0915, 0x0939)]
+    signs = ["", "ा", "ि", "ी", "ु", "े", "ो", "ं"]
+    vocabulary = ["".join(rng.choice(letters) + rng.choice(signs) for _ in range(rng.randint(2, 4))) for _ in range(5000)]
+    posts = []
+    for i in range(count):
+        if i % 10 == 9 and posts:
+            words = rng.choice(posts).split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            posts.append(" ".join(words) + rng.choice(["", " 😮", "\n\nSource: RONB"]))
+        else:
+            posts.append(" ".join(rng.choice(vocabulary) for _ in range(rng.randint(20, 60))) + " ।")
+    return posts
+
+
+def benchmark(count: int) -> None:
+    posts = synthetic_posts(count)
+    index = NearDuplicateIndex()
+
+    started = time.perf_counter()
+    signatures = [index.hasher.signature(text) for text in posts]
+    hashing = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i, signature in enumerate(signatures):
+        index.add(i, signature=signature)
+    indexing = time.perf_counter() - started
+
+    queries = signatures[-200:]
+    started = time.perf_counter()
+    lsh_hits = [index._matches(s) for s in queries]
+    lsh = (time.perf_counter() - started) / len(queries)
+
+    matrix = np.stack(signatures)
+    started = time.perf_counter()
+    brute_hits = [np.flatnonzero((matrix == s).mean(axis=1) >= index.threshold) for s in queries]
+    brute = (time.perf_counter() - started) / len(queries)
+
+    recall = sum(len(h) for h in lsh_hits) / max(sum(len(h) for h in brute_hits), 1)
+    print(f"{count:,} posts: minhash {hashing:.1f} s, index {indexing:.1f} s, "
+          f"{len(index.clusters()):,} clusters", file=sys.stderr)
+    print(f"  query: LSH {lsh * 1000:.2f} ms, brute force {brute * 1000:.2f} ms; "
+          f"LSH found {recall:.1%} of brute-force matches", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find near-duplicate RONB posts")
+    parser.add_argument("feed", nargs="?", type=Path, help="ronb_feed.json to scan")
+    parser.add_argument("--store", type=Path, help="Scan the post store instead")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Estimated Jaccard threshold")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark on N synthetic posts")
+    args = parser.parse_args()
+
+    if np is None:
+        print("numpy is required: pip install numpy", file=sys.stderr)
+        sys.exit(1)
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    if not args.feed and not args.store:
+        parser.error("give a feed file or --store")
+
+    posts = load_posts(args)
+    index = NearDuplicateIndex(threshold=args.threshold)
+    for key, text in posts.items():
+        index.add(key, text)
+
+    clusters = index.clusters()
+    print(f"{len(posts)} posts, {len(clusters)} near-duplicate clusters", file=sys.stderr)
+    for cluster in clusters:
+        print(f"\n[{len(cluster)} variants]")
+        for key in cluster:
+            print(f"  {key}: {posts[key][:80]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Persistent RONB post store backed by SQLite.
+
+Posts are identified by a hash of their whitespace-normalized text; an
+edited post is recognised by its URL plus creation time. Every post also
+has a stable integer id (an INTEGER PRIMARY KEY, which VACUUM does not
+renumber) that near-duplicate signatures refer to. Upserting a scrape
+inserts unseen posts and refreshes the ones already stored (a later scrape
+may add a URL or an edited text), so history accumulates across runs
+instead of being replaced by whatever the page currently shows.
+
+With near_duplicates=True every post also gets a MinHash signature
+(ronb_dedup.py). A new post whose text is a near-duplicate of a stored one
+(a republish with a "Source:" line or emoji changed) is kept as a variant
+in that post's cluster: it is not reported as new and the feed shows only
+the first post of each cluster. Posts stored before signatures existed are
+indexed on open. An edited post is re-signed and the clusters recomputed,
+since an edit can both join and split them; a post an edit splits off
+into a cluster of its own is reported as new in that run, as it only now
+appears in the feed. (Clusters recomputed on open, for posts edited while
+near-duplicate detection was off, surface such posts in the feed only.)
+
+Stores from before post ids existed are migrated on open: ids are taken
+from the old rowids and signatures are recomputed on the next
+near-duplicate open.
+
+Every upsert is recorded as a run. From the store scrape_ronb.py writes:
+    ronb_feed.json         the newest `window` posts (same schema as before)
+    ronb_feed_delta.json   posts first seen in this run, plus "run" and
+                           "previous_run" so a client that already has
+                           previous_run can apply just the delta
+
+Usage:
+    python3 scripts/scrape_ronb.py --store data/ronb_posts.db -o data/ronb_feed.json --delta data/ronb_feed_delta.json
+
+    from ronb_store import PostStore
+    store = PostStore(Path("data/ronb_posts.db"))
+    run, new_posts = store.upsert(posts, scraped_at)
+    store.latest(50)
+"""
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    url TEXT UNIQUE,
+    text TEXT NOT NULL,
+    timestamp INTEGER,
+    datetime_utc TEXT,
+    datetime_npt TEXT,
+    first_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_timestamp ON posts (timestamp);
+CREATE INDEX IF NOT EXISTS posts_first_run ON posts (first_run);
+CREATE TABLE IF NOT EXISTS signatures (
+    post_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL,
+    cluster INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures (cluster);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scraped_at TEXT NOT NULL,
+    seen INTEGER NOT NULL,
+    new INTEGER NOT NULL
+);
+"""
+
+# posts keyed only by content_hash, with signatures on their implicit rowid
+MIGRATE_POST_IDS = (
+    "BEGIN;"
+    "ALTER TABLE posts RENAME TO posts_without_id;"
+    "DROP INDEX IF EXISTS posts_timestamp;"
+    "DROP INDEX IF EXISTS posts_first_run;"
+    "DROP TABLE IF EXISTS signatures;"
+    + SCHEMA
+    + "INSERT INTO posts SELECT rowid, * FROM posts_without_id ORDER BY rowid;"
+    "DROP TABLE posts_without_id;"
+    "COMMIT;"
+)
+
+POST_FIELDS = ["text", "timestamp", "datetime_utc", "datetime_npt", "url"]
+
+
+def content_hash(text: str) -> str:
+    """Hash of the post text with whitespace collapsed."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class PostStore:
+    def __init__(self, path: Path, near_duplicates: bool = False, threaded: bool = False):
+        """threaded=True allows use from threads other than the opening one, never concurrently."""
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=not threaded)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(posts)")]
+        if columns and "id" not in columns:
+            self.conn.executescript(MIGRATE_POST_IDS)
+        self.conn.executescript(SCHEMA)
+        self.index = None
+        if near_duplicates:
+            self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the LSH index from stored signatures, then sign unsigned posts."""
+        from ronb_dedup import NearDuplicateIndex, np
+
+        self.index = NearDuplicateIndex()
+        rows = self.conn.execute("SELECT post_id, signature, cluster FROM signatures ORDER BY post_id").fetchall()
+        for post_id, signature, cluster in rows:
+            self.index.add(post_id, signature=np.frombuffer(signature, dtype=np.uint32), cluster=cluster)
+
+        unsigned = self.conn.execute(
+            "SELECT id, text FROM posts WHERE id NOT IN (SELECT post_id FROM signatures) ORDER BY id"
+        ).fetchall()
+        with self.conn:
+            if unsigned and rows and unsigned[0][0] < rows[-1][0]:
+                # Posts edited while near-duplicate detection was off lost
+                # their signatures; clusters built without them may be wrong
+                self.conn.executemany(
+                    "INSERT INTO signatures VALUES (?, ?, ?)",
+                    [(post_id, self.index.hasher.signature(text).tobytes(), post_id) for post_id, text in unsigned],
+                )
+                self._recluster()
+            else:
+                for post_id, text in unsigned:
+                    self._sign(post_id, text)
+
+    def _sign(self, post_id: int, text: str) -> int:
+        """Index a post and store its signature; returns its cluster."""
+        matches = self.index.add(post_id, text)
+        cluster = self.index.cluster_of(post_id)
+        self.conn.execute(
+            "INSERT INTO signatures VALUES (?, ?, ?)",
+            (post_id, self.index.signatures[post_id].tobytes(), cluster),
+        )
+        if matches:
+            # The post may bridge clusters that were separate until now
+            others = [key for key, _ in matches]
+            self.conn.execute(
+                f"UPDATE signatures SET cluster = ? WHERE cluster IN "
+                f"(SELECT cluster FROM signatures WHERE post_id IN ({', '.join('?' * len(others))}))",
+                (cluster, *others),
+            )
+        return cluster
+
+    def _resign(self, post_id: int, text: str) -> list[int]:
+        """Replace an edited post's signature and recompute every cluster; returns posts split off."""
+        self.conn.execute(
+            "UPDATE signatures SET signature = ? WHERE post_id = ?",
+            (self.index.hasher.signature(text).tobytes(), post_id),
+        )
+        # Union-find cannot split a cluster the old text held together, so
+        # start over from the stored signatures; edits are rare
+        return self._recluster()
+
+    def _recluster(self) -> list[int]:
+        """
+        Index every stored signature afresh in post order and store the
+        clusters that changed; returns the posts that were variants and now
+        lead a cluster of their own.
+        """
+        from ronb_dedup import NearDuplicateIndex, np
+
+        index = NearDuplicateIndex()
+        rows = self.conn.execute("SELECT post_id, signature, cluster FROM signatures ORDER BY post_id").fetchall()
+        for post_id, signature, _ in rows:
+            index.add(post_id, signature=np.frombuffer(signature, dtype=np.uint32))
+        self.conn.executemany(
+            "UPDATE signatures SET cluster = ? WHERE post_id = ?",
+            [(index.cluster_of(post_id), post_id) for post_id, _, cluster in rows if index.cluster_of(post_id) != cluster],
+        )
+        self.index = index
+        return [post_id for post_id, _, cluster in rows if cluster != post_id == index.cluster_of(post_id)]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _find(self, digest: str, url: str | None, timestamp: int | None) -> tuple | None:
+        """
+        Stored (id, content_hash, url) row for this post: same text, or same
+        URL and creation time (an edited post). URLs are paired with messages
+        by page position, so a URL alone is not trusted to identify a post.
+        """
+        row = self.conn.execute("SELECT id, content_hash, url FROM posts WHERE content_hash = ?", (digest,)).fetchone()
+        if row is None and url and timestamp:
+            row = self.conn.execute(
+                "SELECT id, content_hash, url FROM posts WHERE url = ? AND timestamp = ?", (url, timestamp)
+            ).fetchone()
+        return row
+
+    def _url_taken(self, url: str | None) -> bool:
+        return bool(url) and self.conn.execute("SELECT 1 FROM posts WHERE url = ?", (url,)).fetchone() is not None
+
+    def upsert(self, posts: list[dict], scraped_at: str) -> tuple[int, list[dict]]:
+        """Store one scrape atomically; returns (run id, posts not seen before)."""
+        try:
+            return self._upsert(posts, scraped_at)
+        except Exception:
+            if self.index is not None:
+                # The in-memory index may hold posts the rollback discarded
+                self._load_index()
+            raise
+
+    def _upsert(self, posts: list[dict], scraped_at: str) -> tuple[int, list[dict]]:
+        new_posts = []
+        split_off: set[int] = set()
+        with self.conn:
+            run = self.conn.execute(
+                "INSERT INTO runs (scraped_at, seen, new) VALUES (?, ?, 0)", (scraped_at, len(posts))
+            ).lastrowid
+
+            for post in posts:
+                digest = content_hash(post["text"])
+                url = post.get("url")
+                existing = self._find(digest, url, post.get("timestamp"))
+
+                if existing is None:
+                    post_id = self.conn.execute(
+                        "INSERT INTO posts (content_hash, url, text, timestamp, datetime_utc, datetime_npt, "
+                        "first_run, last_run) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (digest, None if self._url_taken(url) else url, post["text"], post.get("timestamp"),
+                         post.get("datetime_utc"), post.get("datetime_npt"), run, run),
+                    ).lastrowid
+                    if self.index is None or self._sign(post_id, post["text"]) == post_id:
+                        new_posts.append(post)
+                    continue
+
+                # Seen before: take the latest text and fill in whatever an
+                # earlier scrape missed
+                post_id, old_digest, old_url = existing
+                if old_url is None and self._url_taken(url):
+                    url = None
+                self.conn.execute(
+                    """
+                    UPDATE posts SET
+                        content_hash = ?,
+                        text = ?,
+                        url = COALESCE(url, ?),
+                        timestamp = COALESCE(timestamp, ?),
+                        datetime_utc = COALESCE(datetime_utc, ?),
+                        datetime_npt = COALESCE(datetime_npt, ?),
+                        last_run = ?
+                    WHERE id = ?
+                    """,
+                    (digest, post["text"], url, post.get("timestamp"),
+                     post.get("datetime_utc"), post.get("datetime_npt"), run, post_id),
+                )
+                if digest != old_digest:
+                    if self.index is not None:
+                        split_off.update(self._resign(post_id, post["text"]))
+                    else:
+                        # Re-signed (and reclustered) on the next near-duplicate open
+                        self.conn.execute("DELETE FROM signatures WHERE post_id = ?", (post_id,))
+
+            if split_off:
+                # A later edit in this run may have merged some back
+                ids = sorted(split_off)
+                rows = self.conn.execute(
+                    f"SELECT {', '.join(POST_FIELDS)} FROM posts JOIN signatures ON post_id = id "
+                    f"WHERE cluster = id AND id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+                    ids,
+                )
+                new_posts.extend(dict(zip(POST_FIELDS, row)) for row in rows)
+
+            self.conn.execute("UPDATE runs SET new = ? WHERE id = ?", (len(new_posts), run))
+        return run, new_posts
+
+    def previous_run(self, run: int) -> int | None:
+        row = self.conn.execute("SELECT MAX(id) FROM runs WHERE id < ?", (run,)).fetchone()
+        return row[0]
+
+    def latest(self, limit: int) -> list[dict]:
+        """Newest posts by timestamp, in the ronb_feed.json post schema; variants are left out."""
+        rows = self.conn.execute(
+            f"SELECT {', '.join(POST_FIELDS)} FROM posts "
+            "WHERE id NOT IN (SELECT post_id FROM signatures WHERE cluster != post_id) "
+            "ORDER BY COALESCE(timestamp, 0) DESC, first_run DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(zip(POST_FIELDS, row)) for row in rows]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def variants(self, post_id: int) -> list[int]:
+        """Ids of every post in the same near-duplicate cluster, the first post included."""
+        rows = self.conn.execute(
+            "SELECT post_id FROM signatures WHERE cluster = (SELECT cluster FROM signatures WHERE post_id = ?) "
+            "ORDER BY post_id",
+            (post_id,),
+        )
+        return [row[0] for row in rows]
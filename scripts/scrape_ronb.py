@@ -9,19 +9,38 @@ Usage:
     python3 scripts/scrape_ronb.py                    # Output to stdout
     python3 scripts/scrape_ronb.py -o data/ronb.json  # Output to file
     python3 scripts/scrape_ronb.py --pretty            # Pretty print
+    python3 scripts/scrape_ronb.py --save-page page.html  # Keep the fetched HTML
+    python3 scripts/scrape_ronb.py --input page.html   # Parse a saved page
+    python3 scripts/scrape_ronb.py --benchmark page.html  # Time extraction on growing pages
+    python3 scripts/scrape_ronb.py --stream --limit 20   # Scan while downloading, stop after 20 posts
+    python3 scripts/scrape_ronb.py --benchmark --stream  # Streaming time-to-first-post and memory
+    python3 scripts/scrape_ronb.py --store data/ronb_posts.db -o data/ronb_feed.json \
+        --delta data/ronb_feed_delta.json             # Keep history, write rolling feed + delta
 """
 
 import argparse
+import codecs
 import json
+import random
 import re
 import sys
+import time
 import urllib.request
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ronb_store import PostStore
 
 FACEBOOK_PAGE = "officialroutineofnepalbanda"
 PAGE_URL = f"https://www.facebook.com/{FACEBOOK_PAGE}/"
 NEPAL_TZ = timezone(timedelta(hours=5, minutes=45))
 
+# Posts kept in ronb_feed.json when scraping into a --store
+DEFAULT_WINDOW = 50
+
 GOOGLEBOT_UA = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
 
 
@@ -43,80 +62,71 @@ def clean_text(raw: str) -> str:
     return text.strip()
 
 
-def extract_posts(html: str) -> list[dict]:
-    """Extract post data from Facebook page HTML."""
-    posts = []
+# One alternation so a single scan of the page finds all three kinds of
+# item; match positions come out already sorted.
+TOKEN_PATTERN = re.compile(
+    r'"message":\{"text":"(?P<msg>(?:[^"\\]|\\.){5,5000})"\}'
+    r'|"creation_time":(?P<ts>\d{10})'
+    r'|"url":"(?P<url>https://www\.facebook\.com/' + FACEBOOK_PAGE + r'/posts/[^"]+)"'
+)
 
-    # Facebook embeds post data as JSON in the page source.
-    # Strategy: find all "creation_story" objects which contain post text and metadata.
 
-    # Extract (message_text, creation_time, post_id) tuples
-    # We need to correlate them. The most reliable approach is to find
-    # JSON-like structures containing both message and timestamp.
+def make_post(text: str, timestamp: int | None, url: str | None) -> dict:
+    return {
+        "text": text,
+        "timestamp": timestamp,
+        "datetime_utc": datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat() if timestamp else None,
+        "datetime_npt": datetime.fromtimestamp(timestamp, tz=NEPAL_TZ).strftime("%Y-%m-%d %H:%M") if timestamp else None,
+        "url": url,
+    }
 
-    # Extract post URLs
-    url_pattern = re.compile(r'"url":"(https://www\.facebook\.com/' + FACEBOOK_PAGE + r'/posts/[^"]+)"')
-    post_urls = url_pattern.findall(html)
 
-    # Extract messages and timestamps separately, then pair by proximity
-    msg_pattern = re.compile(r'"message":\{"text":"((?:[^"\\]|\\.){5,5000})"\}')
-    ts_pattern = re.compile(r'"creation_time":(\d{10})')
+def nearest(positions: list[int], values: list, pos: int):
+    """Value whose position is closest to pos; the earlier one wins ties."""
+    i = bisect_left(positions, pos)
+    if i == 0:
+        return values[0] if values else None
+    if i == len(positions) or pos - positions[i - 1] <= positions[i] - pos:
+        return values[i - 1]
+    return values[i]
+
+
+def extract_posts(html: str) -> list[dict]:
+    """Extract post data from Facebook page HTML."""
+    posts = []
 
+    # Facebook embeds post data as JSON in the page source. Messages,
+    # creation times and post URLs appear as separate JSON fragments, so
+    # each message is paired with the nearest timestamp and URL by position.
     messages = []
-    for m in msg_pattern.finditer(html):
-        messages.append({
-            "text": clean_text(m.group(1)),
-            "pos": m.start(),
-        })
-
-    timestamps = []
-    for m in ts_pattern.finditer(html):
-        timestamps.append({
-            "ts": int(m.group(1)),
-            "pos": m.start(),
-        })
-
-    # Pair each message with the nearest timestamp
-    seen_texts = set()
-    for msg in messages:
-        text = msg["text"]
+    ts_positions, ts_values = [], []
+    url_positions, url_values = [], []
+    seen_urls = set()
+
+    for m in TOKEN_PATTERN.finditer(html):
+        kind = m.lastgroup
+        if kind == "msg":
+            messages.append((clean_text(m.group("msg")), m.start()))
+        elif kind == "ts":
+            ts_positions.append(m.start())
+            ts_values.append(int(m.group("ts")))
+        else:
+            # A URL repeated later in the page keeps its first position
+            url = m.group("url")
+            if url not in seen_urls:
+                seen_urls.add(url)
+                url_positions.append(m.start("url"))
+                url_values.append(url)
 
+    seen_texts = set()
+    for text, pos in messages:
         # Deduplicate (Facebook sometimes repeats posts in different formats)
         text_key = text[:100]
         if text_key in seen_texts:
             continue
         seen_texts.add(text_key)
 
-        # Find nearest timestamp
-        nearest_ts = None
-        min_dist = float("inf")
-        for ts in timestamps:
-            dist = abs(ts["pos"] - msg["pos"])
-            if dist < min_dist:
-                min_dist = dist
-                nearest_ts = ts["ts"]
-
-        # Find nearest post URL
-        nearest_url = None
-        min_url_dist = float("inf")
-        for url in post_urls:
-            # Find position of this URL in HTML
-            url_pos = html.find(url)
-            if url_pos >= 0:
-                dist = abs(url_pos - msg["pos"])
-                if dist < min_url_dist:
-                    min_url_dist = dist
-                    nearest_url = url
-
-        post = {
-            "text": text,
-            "timestamp": nearest_ts,
-            "datetime_utc": datetime.fromtimestamp(nearest_ts, tz=timezone.utc).isoformat() if nearest_ts else None,
-            "datetime_npt": datetime.fromtimestamp(nearest_ts, tz=NEPAL_TZ).strftime("%Y-%m-%d %H:%M") if nearest_ts else None,
-            "url": nearest_url,
-        }
-
-        posts.append(post)
+        posts.append(make_post(text, nearest(ts_positions, ts_values, pos), nearest(url_positions, url_values, pos)))
 
     # Sort by timestamp descending (newest first)
     posts.sort(key=lambda p: p.get("timestamp") or 0, reverse=True)
@@ -124,30 +134,346 @@ def extract_posts(html: str) -> list[dict]:
     return posts
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Scrape RONB Facebook page")
-    parser.add_argument("-o", "--output", help="Output file path (default: stdout)")
-    parser.add_argument("--pretty", action="store_true", help="Pretty print JSON")
-    args = parser.parse_args()
+class StreamingExtractor:
+    """
+    Incremental extract_posts over a page arriving in text chunks.
+
+    feed() scans each chunk as it arrives and returns the posts whose
+    nearest timestamp and URL are already settled, i.e. a timestamp and a
+    URL have been seen after the message (anything later can only be
+    farther away). Only the unscanned tail of the page is buffered: a token
+    is never longer than MAX_TOKEN characters, so every match starting more
+    than MAX_TOKEN before the end of the buffer is complete, and anything
+    after that point waits for the next chunk. Fed a whole page, the posts
+    equal extract_posts() before its final sort.
+    """
+
+    # "message" prefix + 5000 escaped characters + closing, rounded up; post
+    # URLs are far shorter
+    MAX_TOKEN = 16384
+
+    def __init__(self):
+        self.buffer = ""
+        self.base = 0  # page offset of buffer[0]
+        self.messages: deque[tuple[str, int]] = deque()
+        self.ts_positions, self.ts_values = [], []
+        self.url_positions, self.url_values = [], []
+        self.seen_urls = set()
+        self.seen_texts = set()
+
+    def _scan(self, final: bool) -> None:
+        safe = len(self.buffer) if final else len(self.buffer) - self.MAX_TOKEN
+        resume = max(safe, 0)
+        for m in TOKEN_PATTERN.finditer(self.buffer):
+            if m.start() >= safe:
+                break
+            resume = max(resume, m.end())
+            kind = m.lastgroup
+            if kind == "msg":
+                text = clean_text(m.group("msg"))
+                # Deduplicate (Facebook sometimes repeats posts in different formats)
+                if text[:100] not in self.seen_texts:
+                    self.seen_texts.add(text[:100])
+                    self.messages.append((text, self.base + m.start()))
+            elif kind == "ts":
+                self.ts_positions.append(self.base + m.start())
+                self.ts_values.append(int(m.group("ts")))
+            else:
+                url = m.group("url")
+                if url not in self.seen_urls:
+                    self.seen_urls.add(url)
+                    self.url_positions.append(self.base + m.start("url"))
+                    self.url_values.append(url)
+
+        self.buffer = self.buffer[resume:]
+        self.base += resume
+
+    def _resolve(self, final: bool) -> list[dict]:
+        posts = []
+        while self.messages:
+            text, pos = self.messages[0]
+            settled = (
+                self.ts_positions and self.ts_positions[-1] > pos
+                and self.url_positions and self.url_positions[-1] > pos
+            )
+            if not (settled or final):
+                break
+            self.messages.popleft()
+            posts.append(make_post(
+                text,
+                nearest(self.ts_positions, self.ts_values, pos),
+                nearest(self.url_positions, self.url_values, pos),
+            ))
+
+        # Keep only the timestamps/URLs that can still be nearest to a
+        # pending or future message
+        frontier = self.messages[0][1] if self.messages else self.base
+        for positions, values in ((self.ts_positions, self.ts_values), (self.url_positions, self.url_values)):
+            drop = max(bisect_left(positions, frontier) - 1, 0)
+            del positions[:drop], values[:drop]
+        return posts
+
+    def feed(self, chunk: str) -> list[dict]:
+        self.buffer += chunk
+        self._scan(final=False)
+        return self._resolve(final=False)
+
+    def close(self) -> list[dict]:
+        self._scan(final=True)
+        return self._resolve(final=True)
+
+
+def iter_page_chunks(url: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Fetch a page and yield it as decoded text chunks as they arrive."""
+    req = urllib.request.Request(url, headers={"User-Agent": GOOGLEBOT_UA})
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        while chunk := resp.read(chunk_size):
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
 
-    print(f"Fetching {PAGE_URL}...", file=sys.stderr)
-    html = fetch_page(PAGE_URL)
-    print(f"Page size: {len(html):,} bytes", file=sys.stderr)
 
-    posts = extract_posts(html)
-    print(f"Extracted {len(posts)} posts", file=sys.stderr)
+def iter_file_chunks(path: str, chunk_size: int = 64 * 1024) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def tee_chunks(chunks: Iterator[str], path: str) -> Iterator[str]:
+    """Pass chunks through while writing them to path (--save-page while streaming)."""
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+    finally:
+        chunks.close()
+
+
+def stream_posts(chunks: Iterable[str], limit: int | None = None) -> Iterator[dict]:
+    """Posts in page order as the chunks are scanned; stops reading after `limit` posts."""
+    extractor = StreamingExtractor()
+    count = 0
+    try:
+        for chunk in chunks:
+            for post in extractor.feed(chunk):
+                yield post
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+        for post in extractor.close():
+            if limit is not None and count >= limit:
+                return
+            yield post
+            count += 1
+    finally:
+        # Stop the download (and close the connection) when ending early
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+def extract_posts_nested(html: str) -> list[dict]:
+    """
+    Reference implementation: every message scans all timestamps and
+    searches the page for every URL. Kept for --benchmark.
+    """
+    url_pattern = re.compile(r'"url":"(https://www\.facebook\.com/' + FACEBOOK_PAGE + r'/posts/[^"]+)"')
+    post_urls = url_pattern.findall(html)
+    msg_pattern = re.compile(r'"message":\{"text":"((?:[^"\\]|\\.){5,5000})"\}')
+    ts_pattern = re.compile(r'"creation_time":(\d{10})')
+
+    messages = [(clean_text(m.group(1)), m.start()) for m in msg_pattern.finditer(html)]
+    timestamps = [(int(m.group(1)), m.start()) for m in ts_pattern.finditer(html)]
+
+    posts = []
+    seen_texts = set()
+    for text, pos in messages:
+        if text[:100] in seen_texts:
+            continue
+        seen_texts.add(text[:100])
+
+        nearest_ts, min_dist = None, float("inf")
+        for ts, ts_pos in timestamps:
+            if abs(ts_pos - pos) < min_dist:
+                min_dist, nearest_ts = abs(ts_pos - pos), ts
+
+        nearest_url, min_url_dist = None, float("inf")
+        for url in post_urls:
+            url_pos = html.find(url)
+            if url_pos >= 0 and abs(url_pos - pos) < min_url_dist:
+                min_url_dist, nearest_url = abs(url_pos - pos), url
+
+        posts.append(make_post(text, nearest_ts, nearest_url))
+
+    posts.sort(key=lambda p: p.get("timestamp") or 0, reverse=True)
+    return posts
 
-    result = {
+
+def synthetic_page(post_count: int, padding: int = 20_000) -> str:
+    """Page shaped like the Facebook payload: each post's fragments separated by filler markup."""
+    rng = random.Random(post_count)
+    parts = []
+    for i in range(post_count):
+        parts.append("<div>" + "x" * rng.randint(padding // 2, padding) + "</div>")
+        parts.append(f'"message":{{"text":"Post {i} \\u0915\\u093e\\u0920\\u092e\\u093e\\u0921\\u094c\\u0902 {rng.random()}"}}')
+        parts.append("," * rng.randint(10, 500))
+        parts.append(f'"creation_time":{1700000000 + i * 3600}')
+        parts.append("," * rng.randint(10, 500))
+        parts.append(f'"url":"https://www.facebook.com/{FACEBOOK_PAGE}/posts/pfbid{i:08d}"')
+    return "".join(parts)
+
+
+def benchmark(page_file: str | None) -> None:
+    """Time both extractors on pages of increasing size and check they agree."""
+    if page_file:
+        with open(page_file, "r", encoding="utf-8") as f:
+            base = f.read()
+        pages = [base * n for n in (1, 2, 4, 8)]
+    else:
+        pages = [synthetic_page(n) for n in (10, 20, 40, 80, 160)]
+
+    for page in pages:
+        started = time.perf_counter()
+        fast = extract_posts(page)
+        linear = time.perf_counter() - started
+
+        started = time.perf_counter()
+        slow = extract_posts_nested(page)
+        nested = time.perf_counter() - started
+
+        print(
+            f"{len(page) / 1e6:7.1f} MB {len(fast):5} posts: single-pass {linear * 1000:8.1f} ms, "
+            f"nested {nested * 1000:9.1f} ms ({nested / linear:6.1f}x) {'same' if fast == slow else 'DIFFERENT'}",
+            file=sys.stderr,
+        )
+
+
+def benchmark_stream(page_file: str | None, limit: int) -> None:
+    """Time-to-first-post and peak memory of streaming vs whole-page extraction."""
+    import tempfile
+    import tracemalloc
+
+    sizes = (1, 4, 16) if page_file else (20, 80, 320, 1280)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = Path(tmp) / f"page_{n}.html"
+            if page_file:
+                path.write_text(Path(page_file).read_text(encoding="utf-8") * n, encoding="utf-8")
+            else:
+                path.write_text(synthetic_page(n), encoding="utf-8")
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            whole = extract_posts(path.read_text(encoding="utf-8"))
+            whole_time = time.perf_counter() - started
+            whole_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            stream = stream_posts(iter_file_chunks(str(path)), limit)
+            first = next(stream, None)
+            first_time = time.perf_counter() - started
+            streamed = [first, *stream] if first else []
+            stream_time = time.perf_counter() - started
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(
+                f"{path.stat().st_size / 1e6:7.1f} MB: whole page {whole_time * 1000:7.1f} ms, "
+                f"peak {whole_peak / 1e6:6.1f} MB, {len(whole)} posts | streaming first post "
+                f"{first_time * 1000:6.1f} ms, {len(streamed)} posts {stream_time * 1000:7.1f} ms, "
+                f"peak {stream_peak / 1e6:5.2f} MB",
+                file=sys.stderr,
+            )
+
+
+def feed_document(posts: list[dict], scraped_at: datetime) -> dict:
+    return {
         "source": "facebook",
         "page": FACEBOOK_PAGE,
         "page_url": PAGE_URL,
-        "scraped_at": datetime.now(tz=timezone.utc).isoformat(),
-        "scraped_at_npt": datetime.now(tz=NEPAL_TZ).strftime("%Y-%m-%d %H:%M"),
+        "scraped_at": scraped_at.isoformat(),
+        "scraped_at_npt": scraped_at.astimezone(NEPAL_TZ).strftime("%Y-%m-%d %H:%M"),
         "post_count": len(posts),
         "posts": posts,
     }
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape RONB Facebook page")
+    parser.add_argument("-o", "--output", help="Output file path (default: stdout)")
+    parser.add_argument("--pretty", action="store_true", help="Pretty print JSON")
+    parser.add_argument("--input", help="Parse a saved page instead of fetching")
+    parser.add_argument("--save-page", help="Also write the fetched HTML to this file")
+    parser.add_argument("--benchmark", nargs="?", const="", metavar="PAGE",
+                        help="Benchmark extraction on a saved page (default: synthetic pages)")
+    parser.add_argument("--url", default=PAGE_URL, help="Page to fetch")
+    parser.add_argument("--stream", action="store_true",
+                        help="Scan the response chunk by chunk instead of loading the whole page")
+    parser.add_argument("--limit", type=int, help="With --stream, stop after this many posts")
+    parser.add_argument("--store", type=Path, help="SQLite post store; output becomes the rolling window")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Posts in the rolling feed")
+    parser.add_argument("--delta", help="With --store, write posts new in this run to this file")
+    parser.add_argument("--near-dup", action="store_true",
+                        help="With --store, fold near-duplicate republished posts into one (needs numpy)")
+    args = parser.parse_args()
+
+    if args.benchmark is not None:
+        if args.stream:
+            benchmark_stream(args.benchmark or None, args.limit or 20)
+        else:
+            benchmark(args.benchmark or None)
+        return
+
+    if args.stream:
+        print(f"Streaming {args.input or args.url}...", file=sys.stderr)
+        started = time.perf_counter()
+        chunks = iter_file_chunks(args.input) if args.input else iter_page_chunks(args.url)
+        if args.save_page and not args.input:
+            chunks = tee_chunks(chunks, args.save_page)
+        posts = []
+        for post in stream_posts(chunks, args.limit):
+            if not posts:
+                print(f"First post after {(time.perf_counter() - started) * 1000:.0f} ms", file=sys.stderr)
+            posts.append(post)
+        posts.sort(key=lambda p: p.get("timestamp") or 0, reverse=True)
+        if args.save_page and not args.input and args.limit is not None and len(posts) >= args.limit:
+            print(f"Saved page is partial: the download stopped after {args.limit} posts", file=sys.stderr)
+    else:
+        if args.input:
+            with open(args.input, "r", encoding="utf-8") as f:
+                html = f.read()
+        else:
+            print(f"Fetching {args.url}...", file=sys.stderr)
+            html = fetch_page(args.url)
+            if args.save_page:
+                with open(args.save_page, "w", encoding="utf-8") as f:
+                    f.write(html)
+        print(f"Page size: {len(html):,} bytes", file=sys.stderr)
+        posts = extract_posts(html)
+    print(f"Extracted {len(posts)} posts", file=sys.stderr)
+
+    scraped_at = datetime.now(tz=timezone.utc)
     indent = 2 if args.pretty else None
+
+    if args.store:
+        store = PostStore(args.store, near_duplicates=args.near_dup)
+        run, new_posts = store.upsert(posts, scraped_at.isoformat())
+        print(f"Run {run}: {len(new_posts)} new posts, {store.count()} stored", file=sys.stderr)
+
+        if args.delta:
+            delta = feed_document(new_posts, scraped_at)
+            delta["run"] = run
+            delta["previous_run"] = store.previous_run(run)
+            with open(args.delta, "w", encoding="utf-8") as f:
+                f.write(json.dumps(delta, ensure_ascii=False, indent=indent))
+            print(f"Delta written to {args.delta}", file=sys.stderr)
+
+        posts = store.latest(args.window)
+        store.close()
+
+    result = feed_document(posts, scraped_at)
     output = json.dumps(result, ensure_ascii=False, indent=indent)
 
     if args.output:
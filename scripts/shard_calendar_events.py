@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Split data/nepali_calendar_events.json into per-year shards with an index.
+
+Writes data/calendar_events/<year>.json (one compact JSON object per year,
+keyed by "YYYY-MM" like the source file) and data/calendar_events/index.json,
+which records for every month the number of events and holidays and the
+byte range of that month's object inside its shard, plus the SHA-256 of the
+source file so readers can tell when the shards are out of date. EventShards
+reads only the years (or single months) a caller asks for.
+
+Usage:
+    python3 scripts/shard_calendar_events.py
+    python3 scripts/shard_calendar_events.py -i data/nepali_calendar_events.json -o data/calendar_events
+
+    from shard_calendar_events import EventShards
+    shards = EventShards()
+    shards.month(2081, 6)      # {"year": 2081, "month": 6, "days": [...]}
+    shards.year(2082)          # {"2082-01": {...}, ...}
+    shards.is_current()        # False once the events JSON changed since sharding
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_FILE = DATA_DIR / "nepali_calendar_events.json"
+SHARD_DIR = DATA_DIR / "calendar_events"
+
+
+def source_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def month_counts(month_data: dict) -> tuple[int, int]:
+    """(number of events, number of holidays) in a month record."""
+    days = month_data.get("days", [])
+    events = sum(len(d.get("events", [])) for d in days)
+    holidays = sum(1 for d in days if d.get("is_holiday"))
+    return events, holidays
+
+
+def write_shards(data: dict, shard_dir: Path, source: Path = EVENTS_FILE) -> dict:
+    """Write one shard per year of data (read from source) and return the index describing them."""
+    by_year: dict[int, list[str]] = {}
+    for key in sorted(data):
+        by_year.setdefault(int(key.split("-")[0]), []).append(key)
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    index = {"source": source.name, "source_sha256": source_hash(source), "years": {}}
+
+    for year, keys in by_year.items():
+        shard_name = f"{year}.json"
+        months = {}
+        parts = [b"{"]
+        offset = 1
+
+        for i, key in enumerate(keys):
+            prefix = (b",\n" if i else b"\n") + json.dumps(key).encode() + b":"
+            body = json.dumps(data[key], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            parts.extend([prefix, body])
+            offset += len(prefix)
+
+            events, holidays = month_counts(data[key])
+            months[key] = {
+                "events": events,
+                "holidays": holidays,
+                "offset": offset,
+                "length": len(body),
+            }
+            offset += len(body)
+
+        parts.append(b"\n}\n")
+        (shard_dir / shard_name).write_bytes(b"".join(parts))
+
+        index["years"][str(year)] = {
+            "file": shard_name,
+            "events": sum(m["events"] for m in months.values()),
+            "holidays": sum(m["holidays"] for m in months.values()),
+            "months": months,
+        }
+
+    with open(shard_dir / "index.json", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+    return index
+
+
+class EventShards:
+    """Lazy loader over the per-year shards written by write_shards()."""
+
+    def __init__(self, shard_dir: Path = SHARD_DIR):
+        self.shard_dir = shard_dir
+        with open(shard_dir / "index.json", "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self._years: dict[int, dict] = {}
+
+    def is_current(self, source: Path = EVENTS_FILE) -> bool:
+        """Whether the shards were written from the current contents of source."""
+        return self.index.get("source_sha256") == source_hash(source)
+
+    def years(self) -> list[int]:
+        return sorted(int(y) for y in self.index["years"])
+
+    def counts(self, year: int, month: int) -> tuple[int, int]:
+        """(events, holidays) for a month, answered from the index alone."""
+        entry = self._month_entry(year, month)
+        return (entry["events"], entry["holidays"]) if entry else (0, 0)
+
+    def year(self, year: int, cache: bool = True) -> dict:
+        """All months of a year, keyed by "YYYY-MM"; parses one shard file.
+
+        Pass cache=False when streaming years once so memory stays bounded.
+        """
+        if year in self._years:
+            return self._years[year]
+        entry = self.index["years"].get(str(year))
+        if entry is None:
+            return {}
+        with open(self.shard_dir / entry["file"], "r", encoding="utf-8") as f:
+            months = json.load(f)
+        if cache:
+            self._years[year] = months
+        return months
+
+    def month(self, year: int, month: int) -> dict | None:
+        """One month record, read by byte range without parsing the rest of the shard."""
+        if year in self._years:
+            return self._years[year].get(f"{year}-{month:02d}")
+
+        entry = self._month_entry(year, month)
+        if entry is None:
+            return None
+        with open(self.shard_dir / self.index["years"][str(year)]["file"], "rb") as f:
+            f.seek(entry["offset"])
+            return json.loads(f.read(entry["length"]).decode("utf-8"))
+
+    def _month_entry(self, year: int, month: int) -> dict | None:
+        year_entry = self.index["years"].get(str(year))
+        if year_entry is None:
+            return None
+        return year_entry["months"].get(f"{year}-{month:02d}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Shard calendar events by BS year")
+    parser.add_argument("-i", "--input", type=Path, default=EVENTS_FILE, help="Events JSON to shard")
+    parser.add_argument("-o", "--output", type=Path, default=SHARD_DIR, help="Shard directory")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    index = write_shards(data, args.output, args.input)
+
+    # Verify every month reads back identically through the byte-range path
+    shards = EventShards(args.output)
+    for key, month_data in data.items():
+        year, month = (int(p) for p in key.split("-"))
+        assert shards.month(year, month) == month_data, key
+
+    total = sum(p.stat().st_size for p in args.output.glob("*.json") if p.name != "index.json")
+    print(
+        f"Wrote {len(index['years'])} year shards ({total:,} bytes) "
+        f"from {args.input.stat().st_size:,} bytes to {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Verifier for data/bs_calendar_data.json and the converter built on it.
+
+The converter: every BS day in the table is walked through BS→AD→BS and
+consecutive BS days must map to consecutive proleptic Gregorian ordinals.
+The expected values come from the table itself, so this catches bugs in
+bs_calendar.py, not wrong month lengths. Uses numpy when available (well
+under a second for all ~103k days); falls back to a pure-Python walk.
+
+The data, against facts that do not come from the table:
+- historically fixed dates and the published BS new years 2057–2083;
+- every year is one solar year long (365 or 366 days) and every month has
+  29–32 days. Years in KNOWN_ANOMALIES are reported as warnings; every
+  later date is off by what they add.
+
+Usage:
+    python3 scripts/verify_bs_calendar.py                 # Verify data/bs_calendar_data.json
+    python3 scripts/verify_bs_calendar.py path/to/data.json
+"""
+
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+from bs_calendar import BsCalendar, DATA_FILE, np
+
+# (BS date, AD date) pairs fixed by well-documented events
+ANCHORS = [
+    ((1970, 1, 1), date(1913, 4, 13)),    # Table reference date
+    ((2000, 1, 1), date(1943, 4, 14)),    # BS 2000 New Year
+    ((2046, 12, 26), date(1990, 4, 8)),   # Restoration of multiparty democracy
+    ((2047, 7, 23), date(1990, 11, 9)),   # Constitution of 1990 promulgated
+    ((2057, 1, 1), date(2000, 4, 13)),    # BS 2057 New Year
+    ((2063, 1, 11), date(2006, 4, 24)),   # Loktantra Diwas
+    ((2065, 2, 15), date(2008, 5, 28)),   # Republic declared
+    ((2072, 6, 3), date(2015, 9, 20)),    # Constitution of Nepal promulgated
+    ((2080, 1, 1), date(2023, 4, 14)),    # BS 2080 New Year
+    ((2081, 1, 1), date(2024, 4, 13)),    # BS 2081 New Year
+    ((2082, 1, 1), date(2025, 4, 14)),    # BS 2082 New Year
+]
+
+# Baisakh 1 of BS 2057–2083 as printed in Nepal's published calendars
+NEW_YEARS = {
+    2057: date(2000, 4, 13), 2058: date(2001, 4, 14), 2059: date(2002, 4, 14),
+    2060: date(2003, 4, 14), 2061: date(2004, 4, 13), 2062: date(2005, 4, 14),
+    2063: date(2006, 4, 14), 2064: date(2007, 4, 14), 2065: date(2008, 4, 13),
+    2066: date(2009, 4, 14), 2067: date(2010, 4, 14), 2068: date(2011, 4, 14),
+    2069: date(2012, 4, 13), 2070: date(2013, 4, 14), 2071: date(2014, 4, 14),
+    2072: date(2015, 4, 14), 2073: date(2016, 4, 13), 2074: date(2017, 4, 14),
+    2075: date(2018, 4, 14), 2076: date(2019, 4, 14), 2077: date(2020, 4, 13),
+    2078: date(2021, 4, 14), 2079: date(2022, 4, 14), 2080: date(2023, 4, 14),
+    2081: date(2024, 4, 13), 2082: date(2025, 4, 14), 2083: date(2026, 4, 14),
+}
+
+YEAR_LENGTHS = (365, 366)
+MONTH_LENGTHS = range(29, 33)
+
+# Placeholder years in the upstream source (see extract_bs_calendar_data.py)
+KNOWN_ANOMALIES = {2200}
+
+
+def _walk_numpy(cal: BsCalendar) -> list[str]:
+    errors = []
+    lengths = np.asarray(cal.month_lengths, dtype=np.int64)
+    index = np.repeat(np.arange(len(lengths)), lengths)
+    years = cal.first_year + index // 12
+    months = index % 12 + 1
+    days = np.arange(cal.total_days) - np.asarray(cal.month_starts[:-1])[index] + 1
+
+    ordinals = cal.bs_to_ordinal_array(years, months, days)
+    expected = cal.epoch_ordinal + np.arange(cal.total_days)
+    gaps = np.flatnonzero(ordinals != expected)
+    if gaps.size:
+        i = gaps[0]
+        errors.append(f"BS {years[i]}/{months[i]}/{days[i]} breaks contiguity ({gaps.size} days affected)")
+
+    back_y, back_m, back_d = cal.ordinal_to_bs_array(ordinals)
+    mismatch = np.flatnonzero((back_y != years) | (back_m != months) | (back_d != days))
+    if mismatch.size:
+        i = mismatch[0]
+        errors.append(
+            f"Round trip failed for BS {years[i]}/{months[i]}/{days[i]} "
+            f"→ {back_y[i]}/{back_m[i]}/{back_d[i]} ({mismatch.size} days affected)"
+        )
+
+    # datetime64 and Python ordinals must agree at both ends of the range
+    ad = cal.bs_to_ad_array(years[[0, -1]], months[[0, -1]], days[[0, -1]])
+    for value, ordinal in zip(ad.astype(object), expected[[0, -1]]):
+        if value.toordinal() != ordinal:
+            errors.append(f"datetime64 {value} disagrees with ordinal {date.fromordinal(int(ordinal))}")
+
+    return errors
+
+
+def _walk_python(cal: BsCalendar) -> list[str]:
+    errors = []
+    expected = cal.epoch_ordinal
+    for year in range(cal.first_year, cal.last_year + 1):
+        for month in range(1, 13):
+            for day in range(1, cal.month_length(year, month) + 1):
+                ordinal = cal.bs_to_ordinal(year, month, day)
+                if ordinal != expected and len(errors) < 10:
+                    errors.append(f"BS {year}/{month}/{day} breaks contiguity")
+                if cal.ordinal_to_bs(ordinal) != (year, month, day) and len(errors) < 10:
+                    errors.append(f"Round trip failed for BS {year}/{month}/{day}")
+                expected += 1
+    return errors
+
+
+def check_lengths(cal: BsCalendar) -> tuple[list[str], list[str]]:
+    """(errors, warnings) for years and months whose lengths no solar year can have."""
+    errors, warnings = [], []
+    for year in range(cal.first_year, cal.last_year + 1):
+        lengths = [cal.month_length(year, month) for month in range(1, 13)]
+        problems = []
+        if sum(lengths) not in YEAR_LENGTHS:
+            problems.append(f"{sum(lengths)} days")
+        bad_months = [m for m, length in enumerate(lengths, 1) if length not in MONTH_LENGTHS]
+        if bad_months:
+            problems.append(f"month lengths {lengths}")
+        if not problems:
+            continue
+        if year in KNOWN_ANOMALIES:
+            warnings.append(
+                f"BS {year} is placeholder data ({', '.join(problems)}); dates after it are "
+                f"{sum(lengths) - 366}–{sum(lengths) - 365} days late"
+            )
+        else:
+            errors.append(f"BS {year} has {', '.join(problems)}")
+    return errors, warnings
+
+
+def verify_calendar(cal: BsCalendar) -> tuple[list[str], list[str]]:
+    """Return (errors, warnings); no errors means the converter and the checkable data are sound."""
+    errors = _walk_numpy(cal) if np is not None else _walk_python(cal)
+
+    anchors = ANCHORS + [((year, 1, 1), ad) for year, ad in NEW_YEARS.items()]
+    for (year, month, day), ad in anchors:
+        if not cal.first_year <= year <= cal.last_year:
+            continue
+        got = cal.bs_to_ad(year, month, day)
+        if got != ad:
+            errors.append(f"Anchor BS {year}/{month}/{day} maps to {got}, expected {ad}")
+
+    length_errors, warnings = check_lengths(cal)
+    return errors + length_errors, warnings
+
+
+def main() -> None:
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_FILE
+
+    start = time.perf_counter()
+    cal = BsCalendar.load(path)
+    errors, warnings = verify_calendar(cal)
+    elapsed = time.perf_counter() - start
+
+    for error in errors:
+        print(f"ERROR: {error}", file=sys.stderr)
+    for warning in warnings:
+        print(f"WARNING: {warning}", file=sys.stderr)
+
+    print(
+        f"Checked {cal.total_days:,} days (BS {cal.first_year}–{cal.last_year}), "
+        f"{len(ANCHORS) + len(NEW_YEARS)} anchors and every year's length in {elapsed * 1000:.0f} ms",
+        file=sys.stderr,
+    )
+    if errors:
+        sys.exit(1)
+    print("Verification passed.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()